@@ -16,7 +16,7 @@ from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 
 import config
-from main import MasterGrader
+from main import MasterGrader, setup_logging
 
 
 # Ensure stdout is line-buffered so that print logs flush immediately,
@@ -116,6 +116,10 @@ class GradingEngineError(Exception):
 
 app = FastAPI(title="MasterGrader API", version="1.0.0")
 
+# uvicorn only configures its own loggers; without this, the pipeline's
+# logging-based progress messages and warnings are dropped
+setup_logging()
+
 # Allow the Next.js dev server and local desktop app to call this API
 app.add_middleware(
     CORSMiddleware,
@@ -0,0 +1,196 @@
+"""
+Benchmark for the similarity backends and optional accelerators.
+
+Generates a deterministic question directory of C submissions (some of
+them renamed copies of others), then times a full question comparison
+with every available SIMILARITY_BACKEND, and SequenceMatcher from the
+standard library against the one plagiarism_detector uses (cydifflib or
+cdifflib when installed). The number of cases and a digest of the
+reported pairs are printed so runs can be compared for identical results.
+
+Usage:
+    python benchmarks/bench_backends.py [--students N] [--seed S] [--repeat R]
+"""
+
+import argparse
+import contextlib
+import difflib
+import hashlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+import plagiarism_detector
+import tokenizer
+
+# Building blocks for the generated programs (one statement each)
+_STATEMENTS = [
+    "{a} = {b} + {n};",
+    "{a} = {a} * {n} - {b};",
+    "if ({a} > {b}) {{ {a} = {b}; }}",
+    "while ({a} < {n}) {{ {a}++; }}",
+    "for ({i} = 0; {i} < {n}; {i}++) {{ {b} += {i}; }}",
+    'printf("%d\\n", {a});',
+    'scanf("%d", &{b});',
+    "{arr}[{i} % {n}] = {a};",
+    "{a} = {arr}[{n} % 10] / ({b} + 1);",
+    "if ({a} % 2 == 0) {{ {b}--; }} else {{ {b}++; }}",
+]
+
+_NAMES = ["x", "y", "z", "cnt", "sum", "tmp", "val", "res", "num", "acc"]
+
+
+def _generate_program(rng: random.Random, length: int) -> str:
+    """Return a random C program with the given number of statements."""
+    lines = [
+        "#include <stdio.h>",
+        "",
+        "int main() {",
+        "    int x = 0, y = 1, z = 2, i = 0;",
+        "    int arr[10];",
+    ]
+    for _ in range(length):
+        statement = rng.choice(_STATEMENTS).format(
+            a=rng.choice("xyz"), b=rng.choice("xyz"), i="i", arr="arr",
+            n=rng.randint(1, 99),
+        )
+        lines.append("    " + statement)
+    lines += ["    return 0;", "}", ""]
+    return "\n".join(lines)
+
+
+def _disguise(rng: random.Random, source: str) -> str:
+    """Rename the variables of a copied program and insert a statement."""
+    names = rng.sample(_NAMES, 4)
+    for old, new in zip(("x", "y", "z", "arr"), names):
+        source = source.replace(f" {old} ", f" {new} ").replace(f"({old} ", f"({new} ")
+    lines = source.split("\n")
+    extra = rng.choice(_STATEMENTS).format(a="i", b="i", i="i", arr="arr", n=7)
+    lines.insert(rng.randint(5, len(lines) - 3), "    " + extra)
+    return "/* my own solution */\n" + "\n".join(lines)
+
+
+def write_fixture(root: str, students: int, seed: int) -> str:
+    """
+    Write a question directory of generated submissions under root.
+
+    About one submission in five is a disguised copy of an earlier one
+    (possibly itself a copy).
+
+    Returns:
+        Path of the question directory
+    """
+    rng = random.Random(seed)
+    question_dir = os.path.join(root, "Q1")
+    os.makedirs(question_dir, exist_ok=True)
+    sources: List[str] = []
+    for index in range(students):
+        if sources and rng.random() < 0.2:
+            source = _disguise(rng, rng.choice(sources))
+        else:
+            source = _generate_program(rng, rng.randint(20, 60))
+        sources.append(source)
+        with open(os.path.join(question_dir, f"stu{index:03d}.c"), "w") as f:
+            f.write(source)
+    return question_dir
+
+
+def _digest(cases: List[Dict]) -> str:
+    """Short digest of the reported pairs and scores."""
+    text = "\n".join(
+        f"{c['student1']} {c['student2']} {c['similarity']}" for c in cases
+    )
+    return hashlib.md5(text.encode()).hexdigest()[:12]
+
+
+def _best_time(run: Callable[[], object], repeat: int) -> Tuple[float, object]:
+    """Return the fastest of repeat runs and the result of the last one."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def bench_backends(question_dir: str, repeat: int) -> None:
+    """Time a full question comparison with each available backend."""
+    backends = ["difflib", "tokens"]
+    if plagiarism_detector.RAPIDFUZZ_AVAILABLE:
+        backends.append("rapidfuzz")
+    # Pure-Python Greedy String Tiling takes minutes; only time it under numba
+    if plagiarism_detector.GST_JIT_ENABLED:
+        backends.append("gst")
+    for backend in backends:
+        config.Config.SIMILARITY_BACKEND = backend
+
+        def run() -> List[Dict]:
+            detector = plagiarism_detector.PlagiarismDetector()
+            # Keep the detector's progress messages out of the results
+            with contextlib.redirect_stdout(io.StringIO()):
+                return detector.detect_plagiarism_in_question(question_dir, 1)
+
+        seconds, cases = _best_time(run, repeat)
+        print(
+            f"    {backend:<10} {seconds:8.3f}s  "
+            f"{len(cases):4d} cases  digest {_digest(cases)}"
+        )
+
+
+def bench_sequence_matcher(question_dir: str, repeat: int) -> None:
+    """Time stdlib SequenceMatcher against the one plagiarism_detector uses."""
+    token_lists = [
+        tokenizer.tokenize_file_to_list(os.path.join(question_dir, name), "structural")
+        for name in sorted(os.listdir(question_dir))
+    ]
+    # Same strings as the "difflib" backend compares
+    strings = [" ".join(tokens) for tokens in token_lists]
+    pairs = [(a, b) for i, a in enumerate(strings) for b in strings[i + 1:]]
+
+    def ratios(matcher_class) -> List[float]:
+        return [matcher_class(None, a, b).ratio() for a, b in pairs]
+
+    stdlib_seconds, stdlib_ratios = _best_time(lambda: ratios(difflib.SequenceMatcher), repeat)
+    print(f"    difflib    {stdlib_seconds:8.3f}s  {len(pairs)} pairs")
+    if not plagiarism_detector.CDIFFLIB_AVAILABLE:
+        print("    (cydifflib / cdifflib not installed)")
+        return
+    matcher = plagiarism_detector.SequenceMatcher
+    c_seconds, c_ratios = _best_time(lambda: ratios(matcher), repeat)
+    print(
+        f"    {matcher.__module__:<10} {c_seconds:8.3f}s  "
+        f"{stdlib_seconds / c_seconds:.1f}x, "
+        f"identical ratios: {c_ratios == stdlib_ratios}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--students", type=int, default=120, help="submissions to generate")
+    parser.add_argument("--seed", type=int, default=1, help="fixture random seed")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement")
+    args = parser.parse_args()
+
+    config.Config.COMPARISON_WORKERS = 1
+    compiled = plagiarism_detector.__file__.endswith((".so", ".pyd"))
+    print(f"[*] plagiarism_detector compiled with mypyc: {compiled}")
+
+    with tempfile.TemporaryDirectory() as root:
+        question_dir = write_fixture(root, args.students, args.seed)
+        print(f"[*] {args.students} submissions (seed {args.seed})")
+        print("[*] Full question comparison per backend:")
+        bench_backends(question_dir, args.repeat)
+        print("[*] SequenceMatcher.ratio() on every pair:")
+        bench_sequence_matcher(question_dir, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
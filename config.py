@@ -162,6 +162,14 @@ class Config:
     REMOVE_COMMENTS = True  # حذف کامنت‌ها
     REMOVE_INCLUDES = True  # حذف #include ها
     IGNORE_VARIABLES = False  # در صورت True، نام متغیرها در مقایسه نادیده گرفته می‌شود (برای سازگاری با نسخه قدیم)
+    COMPARISON_WORKERS: Optional[int] = None  # تعداد پردازه‌های موازی برای مقایسه جفت‌ها (None = تعداد هسته‌ها، 1 = بدون موازی‌سازی)
+    PARALLEL_MIN_PAIRS = 500  # حداقل تعداد جفت‌ها در یک سوال برای استفاده از پردازش موازی
+    SIMILARITY_BACKEND = "difflib"  # موتور محاسبه شباهت: "difflib" (SequenceMatcher)، "tokens" (SequenceMatcher روی توکن‌ها به جای کاراکترها؛ سریع‌تر، امتیازها متفاوت)، "rapidfuzz" (سریع‌تر، نیاز به نصب؛ امتیازها کمی بالاتر) یا "gst" (Greedy String Tiling به سبک JPlag)
+    GST_MIN_MATCH_LENGTH = 9  # حداقل طول تطابق توکنی در الگوریتم GST (مانند JPlag)
+    MINHASH_PREFILTER = False  # پیش‌فیلتر MinHash-LSH: فقط جفت‌های کاندید به طور کامل مقایسه می‌شوند (سریع‌تر برای کلاس‌های بزرگ، احتمال کمی برای از دست دادن یک جفت مشابه)
+    MINHASH_SHINGLE_SIZE = 5  # طول k-shingle های توکنی برای MinHash
+    MINHASH_NUM_PERM = 64  # تعداد جایگشت‌های MinHash (طول امضا)
+    MINHASH_BANDS = 16  # تعداد باندهای LSH (هر باند NUM_PERM / BANDS سطر)
     
     # تنظیمات حساسیت پیشرفته (Advanced Sensitivity Settings)
     # استفاده از حالت متعادل به عنوان پیش‌فرض
@@ -185,6 +193,8 @@ class Config:
     REPORT_ENCODING = 'utf-8-sig'  # انکودینگ فایل CSV (برای اکسل)
     CONSOLE_OUTPUT_ENABLED = True  # نمایش خروجی در کنسول
     DETAILED_LOGGING = True  # لاگ‌گیری تفصیلی
+    JSON_REPORT_ENABLED = False  # ذخیره گزارش JSON برای استفاده برنامه‌ها (Plagiarism_Report.json)
+    COMPRESS_HTML_REPORTS = False  # ذخیره گزارش‌های HTML به صورت .html.gz (حجم بسیار کمتر؛ مرورگر مستقیماً باز نمی‌کند)
     
     # ==============================
     # کلمات کلیدی C (C Keywords)
@@ -0,0 +1 @@
+# Makes the repository root importable from tests/ (the modules are not a package)
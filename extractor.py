@@ -8,7 +8,7 @@ import zipfile
 import shutil
 import tempfile
 from pathlib import Path
-from typing import List, Set, Dict, Optional
+from typing import Callable, List, Set, Dict, Optional
 
 import config
 
@@ -482,7 +482,9 @@ class ZipExtractor:
 
 
 def extract_student_submissions(
-    root_dir: str, log_callback=None
+    root_dir: str,
+    log_callback=None,
+    on_student_extracted: Optional[Callable[[str, Dict], None]] = None,
 ) -> Dict[str, Dict]:
     """
     استخراج تمام فایل‌های فشرده برای تمام دانشجویان در پوشه‌های موقت
@@ -490,6 +492,8 @@ def extract_student_submissions(
     Args:
         root_dir: مسیر اصلی پوشه دانشجویان
         log_callback: تابع برای ثبت خطاها
+        on_student_extracted: تابعی که پس از استخراج هر دانشجو با
+            (student_id, نتیجه استخراج) فراخوانی می‌شود
 
     Returns:
         دیکشنری شامل مسیرهای پوشه‌های موقت برای هر دانشجو
@@ -528,4 +532,7 @@ def extract_student_submissions(
                 }
                 print("  [WARN] Extraction failed")
 
+            if on_student_extracted is not None:
+                on_student_extracted(student_id, results[student_id])
+
     return results
\ No newline at end of file
@@ -4,7 +4,9 @@ This module uses strict regex-based heuristics to accurately map files to questi
 without cross-question contamination.
 """
 
+import filecmp
 import os
+import queue
 import re
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple
@@ -12,9 +14,76 @@ import logging
 
 import config
 
+# Try to import re2 for linear-time (DFA-based) matching (optional)
+try:
+    import re2
+
+    RE2_AVAILABLE = True
+except ImportError:
+    RE2_AVAILABLE = False
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Digit runs (including non-ASCII digits, which int() also accepts)
+_NUMBER_PATTERN = re.compile(r"\d+")
+
+# Constructs re2 reads differently from stdlib re: \b, \w, \d and \s are
+# ASCII-only in re2 (Unicode in re, e.g. around Persian names), and re's $
+# also matches before a final newline
+_RE2_UNSAFE_PATTERN = re.compile(r"\\[bBwWdDsS]|\$")
+
+
+def _compile_pattern(pattern: str) -> re.Pattern:
+    """
+    Compile a mapping pattern with re2 when available, else with stdlib re.
+
+    Patterns using a construct that re2 interprets differently (see
+    _RE2_UNSAFE_PATTERN), or that re2 refuses to compile, use stdlib re,
+    so search() gives the same result either way.
+    """
+    if RE2_AVAILABLE and not _RE2_UNSAFE_PATTERN.search(pattern):
+        try:
+            return re2.compile(pattern)
+        except Exception:
+            pass
+    return re.compile(pattern)
+
+
+def _fast_copy(src: str, dst: str) -> None:
+    """
+    Copy file contents only (no metadata) using in-kernel copy_file_range.
+
+    Organized files are renamed and their metadata is never reported, so
+    the copystat work done by shutil.copy2 is skipped. Falls back to
+    shutil.copyfile where copy_file_range is unavailable or unsupported.
+    """
+    try:
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            remaining = os.fstat(fsrc.fileno()).st_size
+            while remaining > 0:
+                copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+    except (AttributeError, OSError):
+        import shutil
+
+        shutil.copyfile(src, dst)
+
+
+def _copy_if_changed(src: str, dst: str) -> None:
+    """
+    Copy src to dst unless dst already has the same contents.
+
+    An unchanged organized file keeps its modification time, so the HTML
+    reports generated from it by an earlier run are still newer than it
+    and are reused (see reporter._is_up_to_date).
+    """
+    if os.path.isfile(dst) and filecmp.cmp(src, dst, shallow=False):
+        return
+    _fast_copy(src, dst)
+
 
 class FileMapper:
     """
@@ -34,7 +103,8 @@ class FileMapper:
         Build strict, non-ambiguous regex patterns for each question.
         
         Each pattern is designed to match ONLY that specific question number
-        and will not accidentally match other questions.
+        and will not accidentally match other questions. Patterns are
+        lowercase and case-sensitive; callers match against lowercased text.
         
         Returns:
             Dictionary mapping question_number -> list of regex patterns
@@ -47,40 +117,38 @@ class FileMapper:
             # Pattern 1: Direct question markers (q1, question1, soal1, etc.)
             # Must be word boundaries to prevent matching q10 when looking for q1
             question_patterns.append(
-                re.compile(rf"\bq{q_num}\b", re.IGNORECASE)
+                _compile_pattern(rf"\bq{q_num}\b")
             )
             question_patterns.append(
-                re.compile(rf"\bquestion{q_num}\b", re.IGNORECASE)
+                _compile_pattern(rf"\bquestion{q_num}\b")
             )
             question_patterns.append(
-                re.compile(rf"\bsoal{q_num}\b", re.IGNORECASE)
+                _compile_pattern(rf"\bsoal{q_num}\b")
             )
             question_patterns.append(
-                re.compile(rf"\bsual{q_num}\b", re.IGNORECASE)
+                _compile_pattern(rf"\bsual{q_num}\b")
             )
             question_patterns.append(
-                re.compile(rf"\bproblem{q_num}\b", re.IGNORECASE)
+                _compile_pattern(rf"\bproblem{q_num}\b")
             )
             question_patterns.append(
-                re.compile(rf"\bex{q_num}\b", re.IGNORECASE)
+                _compile_pattern(rf"\bex{q_num}\b")
             )
             question_patterns.append(
-                re.compile(rf"\bexercise{q_num}\b", re.IGNORECASE)
+                _compile_pattern(rf"\bexercise{q_num}\b")
             )
             
             # Pattern 2: Filename patterns (q1.c, question1.c, 1.c, 01.c)
             # Must match at start of filename or after separator
-            ext_pattern = '|'.join([re.escape(ext) for ext in config.Config.ACCEPTED_EXTENSIONS])
+            ext_pattern = '|'.join([re.escape(ext.lower()) for ext in config.Config.ACCEPTED_EXTENSIONS])
             question_patterns.append(
-                re.compile(
-                    rf"(?:^|[/\\])q{q_num}(?:\.(?:{ext_pattern})|[/\\_]|$)",
-                    re.IGNORECASE
+                _compile_pattern(
+                    rf"(?:^|[/\\])q{q_num}(?:\.(?:{ext_pattern})|[/\\_]|$)"
                 )
             )
             question_patterns.append(
-                re.compile(
-                    rf"(?:^|[/\\])question{q_num}(?:\.(?:{ext_pattern})|[/\\_]|$)",
-                    re.IGNORECASE
+                _compile_pattern(
+                    rf"(?:^|[/\\])question{q_num}(?:\.(?:{ext_pattern})|[/\\_]|$)"
                 )
             )
             # Standalone number at start (with extension or separator)
@@ -88,35 +156,33 @@ class FileMapper:
             if q_num < 10:
                 # For single digits, ensure we don't match part of a larger number
                 question_patterns.append(
-                    re.compile(
-                        rf"(?:^|[/\\])(?:0?{q_num})(?:\.(?:{ext_pattern})|[/\\_]|$)",
-                        re.IGNORECASE
+                    _compile_pattern(
+                        rf"(?:^|[/\\])(?:0?{q_num})(?:\.(?:{ext_pattern})|[/\\_]|$)"
                     )
                 )
             else:
                 # For multi-digit, match exactly
                 question_patterns.append(
-                    re.compile(
-                        rf"(?:^|[/\\]){q_num}(?:\.(?:{ext_pattern})|[/\\_]|$)",
-                        re.IGNORECASE
+                    _compile_pattern(
+                        rf"(?:^|[/\\]){q_num}(?:\.(?:{ext_pattern})|[/\\_]|$)"
                     )
                 )
             
             # Pattern 3: Bracket/parenthesis patterns ([1].c, (1).c, _1_.c)
             question_patterns.append(
-                re.compile(rf"\[{q_num}\]", re.IGNORECASE)
+                _compile_pattern(rf"\[{q_num}\]")
             )
             question_patterns.append(
-                re.compile(rf"\({q_num}\)", re.IGNORECASE)
+                _compile_pattern(rf"\({q_num}\)")
             )
             question_patterns.append(
-                re.compile(rf"_{q_num}_", re.IGNORECASE)
+                _compile_pattern(rf"_{q_num}_")
             )
             
             # Pattern 4: Directory patterns (folder name containing question number)
             # Must be a directory name, not part of a filename
             question_patterns.append(
-                re.compile(rf"[/\\](?:q|question|soal|problem|ex|exercise)?{q_num}[/\\]", re.IGNORECASE)
+                _compile_pattern(rf"[/\\](?:q|question|soal|problem|ex|exercise)?{q_num}[/\\]")
             )
             
             patterns[q_num] = question_patterns
@@ -130,16 +196,11 @@ class FileMapper:
         Returns:
             List of integers that are in valid question number range
         """
-        numbers = re.findall(r'\d+', text)
-        valid_numbers = []
-        for num_str in numbers:
-            try:
-                num = int(num_str)
-                if 1 <= num <= config.Config.NUM_QUESTIONS:
-                    valid_numbers.append(num)
-            except ValueError:
-                continue
-        return valid_numbers
+        max_question = config.Config.NUM_QUESTIONS
+        return [
+            num for num in map(int, _NUMBER_PATTERN.findall(text))
+            if 1 <= num <= max_question
+        ]
 
     def _match_strict_patterns(self, file_path: str, file_name: str) -> Optional[Tuple[int, float]]:
         """
@@ -148,29 +209,26 @@ class FileMapper:
         Returns:
             Tuple of (question_number, confidence_score) or None if no match
         """
-        # Normalize path separators
-        normalized_path = file_path.replace('\\', '/')
-        
+        # Normalize path separators and case once for all patterns
+        normalized_path = file_path.replace('\\', '/').lower()
+        name_lower = file_name.lower()
+        dir_parts = normalized_path.split('/')[:-1]  # Exclude filename
+
         # Track all matches with confidence scores
         matches: Dict[int, List[float]] = {}
-        
+
         for q_num, patterns in self.mapping_patterns.items():
             confidence_scores = []
-            
+
             for pattern in patterns:
-                # Check filename
-                if pattern.search(file_name):
+                # Only the highest score per question is used, so stop at the
+                # first (cheapest) check that matches: filename, full path, dirs
+                if pattern.search(name_lower):
                     confidence_scores.append(0.9)
-                
-                # Check full path
-                if pattern.search(normalized_path):
+                elif pattern.search(normalized_path):
                     confidence_scores.append(0.7)
-                
-                # Check directory names in path
-                path_parts = normalized_path.split('/')
-                for part in path_parts[:-1]:  # Exclude filename
-                    if pattern.search(part):
-                        confidence_scores.append(0.5)
+                elif any(pattern.search(part) for part in dir_parts):
+                    confidence_scores.append(0.5)
             
             if confidence_scores:
                 # Use maximum confidence for this question
@@ -285,9 +343,7 @@ class FileMapper:
             
             if result:
                 question_num, confidence = result
-                if question_num not in mapping:
-                    mapping[question_num] = []
-                mapping[question_num].append((file_path, confidence))
+                mapping.setdefault(question_num, []).append((file_path, confidence))
             else:
                 unmapped_files.append(file_path)
         
@@ -305,20 +361,20 @@ class FileMapper:
             if not candidates:
                 continue
             
-            # Sort by confidence (descending) and file path length (ascending)
-            # Prefer shorter paths (likely closer to root)
-            candidates.sort(key=lambda x: (-x[1], len(x[0])))
+            # Highest confidence first, then shortest file path (likely closer
+            # to root); a linear min() is enough since only the best is kept
+            best = min(candidates, key=lambda x: (-x[1], len(x[0])))
             
             # Only take the best match per question
-            best_file = candidates[0][0]
+            best_file = best[0]
             final_mapping[question_num] = [best_file]
             
             # Warn if multiple files matched the same question
             if len(candidates) > 1:
                 logger.warning(
                     f"Student {student_id}, Q{question_num}: Multiple files matched. "
-                    f"Selected '{os.path.basename(best_file)}' (confidence: {candidates[0][1]:.2f}). "
-                    f"Other candidates: {[os.path.basename(f[0]) for f in candidates[1:]]}"
+                    f"Selected '{os.path.basename(best_file)}' (confidence: {best[1]:.2f}). "
+                    f"Other candidates: {[os.path.basename(f[0]) for f in candidates if f is not best]}"
                 )
         
         return final_mapping
@@ -332,8 +388,6 @@ class FileMapper:
         Returns:
             Dictionary with organization results
         """
-        import shutil
-        
         mapping = self.map_student_files(student_dir, student_id)
         
         # Collect all C files for reporting
@@ -349,9 +403,8 @@ class FileMapper:
                 if file_ext in config.Config.ACCEPTED_EXTENSIONS:
                     all_c_files.append(file_path)
         
-        mapped_file_paths = set()
-        for file_paths in mapping.values():
-            mapped_file_paths.update(file_paths)
+        # map_student_files keeps exactly one file per question
+        mapped_file_paths = frozenset(paths[0] for paths in mapping.values() if paths)
         
         unmapped_files = [f for f in all_c_files if f not in mapped_file_paths]
         
@@ -373,7 +426,7 @@ class FileMapper:
             
             try:
                 os.makedirs(dest_dir, exist_ok=True)
-                shutil.copy2(source_file, dest_file)
+                _copy_if_changed(source_file, dest_file)
                 
                 organized["mapped_files"][question_num] = {
                     "source": source_file,
@@ -409,37 +462,77 @@ def organize_all_students(
     print("=" * 60)
     
     for student_id, extraction_data in extraction_results.items():
-        temp_path = extraction_data.get("temp_path")
-        
-        if not temp_path or not os.path.exists(temp_path):
-            logger.warning(f"Student {student_id}: temporary folder does not exist")
-            results[student_id] = {
-                "student_id": student_id,
-                "mapped_files": {},
-                "unmapped_files": [],
-                "total_files": 0,
-            }
-            continue
-        
-        print(f"\n[INFO] Processing {student_id}...")
-        print(f"  [INFO] Temporary folder path: {temp_path}")
-        
-        organized = mapper.organize_student_files(
-            temp_path, student_id, output_dir
+        results[student_id] = _organize_extracted_student(
+            mapper, student_id, extraction_data, output_dir
         )
-        results[student_id] = organized
-        
-        mapped_count = len(organized["mapped_files"])
-        print(f"  [+] {mapped_count} files organized")
-        
-        if organized.get("unmapped_files"):
-            print(
-                f"  [WARN] {len(organized['unmapped_files'])} files were not mapped"
-            )
-        
-        # Print warnings if any
-        if mapper.warnings:
-            for warning in mapper.warnings[:3]:  # Limit to first 3 warnings
-                print(f"  [WARN] {warning}")
     
-    return results
\ No newline at end of file
+    return results
+
+
+def organize_students_from_queue(
+    student_queue: queue.Queue, output_dir: str
+) -> Dict:
+    """
+    Organize students as they arrive from the extraction step.
+    
+    Lets organization of one student overlap with extraction of the next.
+    
+    Args:
+        student_queue: Queue of (student_id, extraction_data) items,
+            terminated by a None sentinel
+        output_dir: Output directory path
+    
+    Returns:
+        Dictionary with organization results for all students
+    """
+    mapper = FileMapper()
+    results: Dict[str, Dict] = {}
+    
+    while True:
+        item = student_queue.get()
+        if item is None:
+            break
+        student_id, extraction_data = item
+        results[student_id] = _organize_extracted_student(
+            mapper, student_id, extraction_data, output_dir
+        )
+    
+    return results
+
+
+def _organize_extracted_student(
+    mapper: FileMapper, student_id: str, extraction_data: Dict, output_dir: str
+) -> Dict:
+    """Organize a single student's extracted files and log the outcome."""
+    temp_path = extraction_data.get("temp_path")
+    
+    if not temp_path or not os.path.exists(temp_path):
+        logger.warning(f"Student {student_id}: temporary folder does not exist")
+        return {
+            "student_id": student_id,
+            "mapped_files": {},
+            "unmapped_files": [],
+            "total_files": 0,
+        }
+    
+    logger.info(f"Processing {student_id}...")
+    logger.debug(f"Student {student_id}: temporary folder path: {temp_path}")
+    
+    organized = mapper.organize_student_files(
+        temp_path, student_id, output_dir
+    )
+    
+    mapped_count = len(organized["mapped_files"])
+    logger.info(f"Student {student_id}: {mapped_count} files organized")
+    
+    if organized.get("unmapped_files"):
+        logger.warning(
+            f"Student {student_id}: {len(organized['unmapped_files'])} files were not mapped"
+        )
+    
+    # Print warnings if any
+    if mapper.warnings:
+        for warning in mapper.warnings[:3]:  # Limit to first 3 warnings
+            logger.warning(warning)
+    
+    return organized
\ No newline at end of file
@@ -2,11 +2,6 @@ import threading
 import socket
 import time
 
-import uvicorn
-import webview
-
-from api import app
-
 
 HOST = "127.0.0.1"
 PORT = 4321
@@ -15,7 +10,14 @@ PORT = 4321
 def run_api() -> None:
     """
     Run the FastAPI application with Uvicorn on a background thread.
+
+    Uvicorn and the API app are imported here so that importing this module
+    does not pull in the web server stack.
     """
+    import uvicorn
+
+    from api import app
+
     uvicorn.run(app, host=HOST, port=PORT, log_level="info")
 
 
@@ -42,6 +44,10 @@ def main() -> None:
     # Give the API server a moment to start up
     wait_for_server(HOST, PORT, timeout=15.0)
 
+    # Imported late: loading the native GUI bindings is slow and only
+    # needed once the server is up
+    import webview
+
     webview.create_window(
         "MasterGrader",
         f"http://{HOST}:{PORT}",
@@ -6,14 +6,14 @@ MasterGrader - سیستم جامع تصحیح و تشخیص تقلب تمرین
 import os
 import sys
 import argparse
-import shutil
+import logging
+import queue
+import threading
 from typing import List, Dict, Optional
 
 import config
-import extractor
-import file_mapper
-import plagiarism_detector
-import reporter
+
+# ماژول‌های هر مرحله فقط در همان مرحله import می‌شوند تا اجرای --help سریع باشد
 
 
 class MasterGrader:
@@ -47,6 +47,12 @@ class MasterGrader:
         self.plagiarism_cases: List[Dict] = []
         self.statistics: Dict = {}
         self.temp_dirs: List[str] = []  # لیست پوشه‌های موقت برای پاکسازی
+        # آمار تجمعی (یک بار محاسبه و در خلاصه نهایی استفاده می‌شود)
+        self._num_students: int = 0
+        self._total_organized: int = 0
+        # سازماندهی هم‌زمان با استخراج (در یک نخ جداگانه) انجام می‌شود
+        self._organize_thread: Optional[threading.Thread] = None
+        self._organize_error: Optional[Exception] = None
 
         # اعمال تنظیمات CLI / API
         if root_dir:
@@ -120,22 +126,40 @@ class MasterGrader:
         print("=" * 80)
 
         try:
-            self.extraction_results = extractor.extract_student_submissions(
-                config.Config.ROOT_DIR,
-                log_callback=self.log_error,
+            import extractor
+
+            # هر دانشجو بلافاصله پس از استخراج برای سازماندهی در صف قرار می‌گیرد
+            student_queue: queue.Queue = queue.Queue(maxsize=32)
+            self._organize_thread = threading.Thread(
+                target=self._organize_worker,
+                args=(student_queue,),
+                daemon=True,
             )
+            self._organize_thread.start()
+
+            try:
+                self.extraction_results = extractor.extract_student_submissions(
+                    config.Config.ROOT_DIR,
+                    log_callback=self.log_error,
+                    on_student_extracted=lambda student_id, result: student_queue.put(
+                        (student_id, result)
+                    ),
+                )
+            finally:
+                student_queue.put(None)
 
             # جمع‌آوری پوشه‌های موقت برای پاکسازی بعدی
             for result in self.extraction_results.values():
                 temp_path = result.get("temp_path")
                 if temp_path:
                     self.temp_dirs.append(temp_path)
+            self._num_students = len(self.extraction_results)
 
             print(
                 f"\n[+] Extraction completed: {len(self.temp_dirs)} temporary folders created"
             )
             print(
-                f"[+] Number of processed students: {len(self.extraction_results)}"
+                f"[+] Number of processed students: {self._num_students}"
             )
 
             return True
@@ -156,19 +180,27 @@ class MasterGrader:
         print("=" * 80)
 
         try:
-            # استفاده از نتایج استخراج (پوشه‌های موقت)
-            self.organization_results = file_mapper.organize_all_students(
-                self.extraction_results,
-                config.Config.OUTPUT_DIR,
-            )
-
-            total_organized = sum(
+            if self._organize_thread is not None:
+                # منتظر پایان سازماندهی هم‌زمان با استخراج
+                self._organize_thread.join()
+                if self._organize_error is not None:
+                    raise self._organize_error
+            else:
+                import file_mapper
+
+                # استفاده از نتایج استخراج (پوشه‌های موقت)
+                self.organization_results = file_mapper.organize_all_students(
+                    self.extraction_results,
+                    config.Config.OUTPUT_DIR,
+                )
+
+            self._total_organized = sum(
                 result.get("total_files", 0)
                 for result in self.organization_results.values()
             )
 
             print(
-                f"\n[+] Organization completed: {total_organized} files organized"
+                f"\n[+] Organization completed: {self._total_organized} files organized"
             )
             print(
                 f"[+] Number of students organized: {len(self.organization_results)}"
@@ -180,6 +212,21 @@ class MasterGrader:
             print(f"\n[ERROR] Organization step failed: {str(e)}")
             return False
 
+    def _organize_worker(self, student_queue: queue.Queue):
+        """سازماندهی دانشجویان به ترتیب ورود از مرحله استخراج"""
+        try:
+            import file_mapper
+
+            self.organization_results = file_mapper.organize_students_from_queue(
+                student_queue,
+                config.Config.OUTPUT_DIR,
+            )
+        except Exception as e:
+            self._organize_error = e
+            # خالی کردن صف تا مرحله استخراج مسدود نشود
+            while student_queue.get() is not None:
+                pass
+
     def step3_plagiarism_detection(self) -> bool:
         """
         مرحله 3: تشخیص تقلب
@@ -192,6 +239,8 @@ class MasterGrader:
         print("=" * 80)
 
         try:
+            import plagiarism_detector
+
             (
                 self.plagiarism_cases,
                 self.statistics,
@@ -221,6 +270,8 @@ class MasterGrader:
             True اگر موفق بود
         """
         try:
+            import reporter
+
             report_gen = reporter.Reporter()
             report_gen.generate_all_reports(
                 self.plagiarism_cases, self.statistics
@@ -277,6 +328,8 @@ class MasterGrader:
 
     def cleanup_temp_dirs(self):
         """پاکسازی پوشه‌های موقت"""
+        import shutil
+
         print(
             f"\n[INFO] Cleaning up {len(self.temp_dirs)} temporary folders..."
         )
@@ -296,12 +349,9 @@ class MasterGrader:
         print("=" * 80)
         print("\n[SUMMARY] Summary:")
         print(
-            f"  - Processed students: {len(self.extraction_results)}"
-        )
-        print(
-            "  - Organized files: "
-            f"{sum(r.get('total_files', 0) for r in self.organization_results.values())}"
+            f"  - Processed students: {self._num_students}"
         )
+        print(f"  - Organized files: {self._total_organized}")
         print(
             f"  - Detected plagiarism cases: {len(self.plagiarism_cases)}"
         )
@@ -384,12 +434,23 @@ Examples:
     return parser.parse_args()
 
 
+def setup_logging():
+    """
+    نمایش پیام‌های پیشرفت ماژول‌ها که از طریق logging ارسال می‌شوند
+    (قابل خاموش شدن با سطح لاگ). توسط CLI و API (و در نتیجه GUI) فراخوانی می‌شود.
+    سطح هر پیام توسط logging در ابتدای آن نوشته می‌شود و در متن پیام‌ها تکرار نمی‌شود.
+    """
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
+
+
 def main():
     """تابع اصلی"""
     try:
         # پارس کردن آرگومان‌ها
         args = parse_arguments()
 
+        setup_logging()
+
         # اعمال تنظیمات اضافی
         if args.questions:
             config.Config.NUM_QUESTIONS = args.questions
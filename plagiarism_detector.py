@@ -5,21 +5,483 @@ while preventing cross-question contamination.
 """
 
 import os
-from typing import List, Dict, Tuple, Optional, Literal, Set
-from difflib import SequenceMatcher
-from collections import defaultdict
+import random
+import zlib
+from typing import Any, Iterator, List, Dict, Tuple, Optional, Literal, Set
+from bisect import bisect_right
+from collections import Counter, defaultdict
+from functools import lru_cache, partial
+from itertools import chain
+from operator import itemgetter
+from concurrent.futures import ProcessPoolExecutor
+from types import FunctionType
 
 import tokenizer
 import config
 
 TokenizationMode = Literal["structural", "literal"]
 
-# Try to import networkx for clustering (optional)
+# Similarity distribution buckets: lower edges and their labels
+SIMILARITY_BUCKET_EDGES = (85, 90, 95, 99)
+SIMILARITY_BUCKET_LABELS = ("85-90", "90-95", "95-99", "99-100")
+
+# Maximum number of pair similarities kept by a detector (oldest evicted first)
+SIMILARITY_CACHE_MAX_SIZE = 100_000
+
+# Rows of the similarity matrix scored per rapidfuzz cdist call
+RAPIDFUZZ_ROW_BLOCK = 256
+
+# Compared pairs between two progress messages of a question
+PROGRESS_INTERVAL = 50
+
+# Column order used when splitting plagiarism cases into parallel arrays
+_CASE_COLUMNS = itemgetter("question", "student1", "student2", "similarity")
+
+# Try to import a C port of difflib's SequenceMatcher (optional, same scores)
+try:
+    from cydifflib import SequenceMatcher
+    CDIFFLIB_AVAILABLE = True
+except ImportError:
+    try:
+        from cdifflib import CSequenceMatcher as SequenceMatcher
+        CDIFFLIB_AVAILABLE = True
+    except ImportError:
+        from difflib import SequenceMatcher
+        CDIFFLIB_AVAILABLE = False
+
+# Try to import scipy for C-level connected components (optional)
+try:
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import connected_components
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+# Try to import networkx for clustering (optional, unused when scipy is
+# available, so its slow import is skipped then)
+NETWORKX_AVAILABLE = False
+if not SCIPY_AVAILABLE:
+    try:
+        import networkx as nx
+        NETWORKX_AVAILABLE = True
+    except ImportError:
+        pass
+
+# Try to import rapidfuzz for a C++ similarity backend (optional)
+try:
+    from rapidfuzz import fuzz, process
+    from rapidfuzz.distance import Indel
+    RAPIDFUZZ_AVAILABLE = True
+except ImportError:
+    RAPIDFUZZ_AVAILABLE = False
+
+# Try to import numba to JIT-compile the greedy string tiling kernel (optional)
 try:
-    import networkx as nx
-    NETWORKX_AVAILABLE = True
+    import numpy as np
+    from numba import njit
+    NUMBA_AVAILABLE = True
 except ImportError:
-    NETWORKX_AVAILABLE = False
+    NUMBA_AVAILABLE = False
+
+
+def _gst_tiled_length(a, b, min_match: int) -> int:
+    """
+    Greedy String Tiling (JPlag): total length of non-overlapping common
+    token tiles of at least min_match tokens.
+    
+    Works on any int sequences; JIT-compiled over int arrays when numba
+    is available.
+    """
+    len_a = len(a)
+    len_b = len(b)
+    marked_a = [False] * len_a
+    marked_b = [False] * len_b
+    tiled = 0
+    
+    max_match = min_match + 1
+    while max_match > min_match:
+        max_match = min_match
+        starts_a: List[int] = []
+        starts_b: List[int] = []
+        
+        # Find all maximal unmarked common substrings of the longest length
+        for p in range(len_a):
+            if marked_a[p]:
+                continue
+            for t in range(len_b):
+                length = 0
+                while (
+                    p + length < len_a
+                    and t + length < len_b
+                    and a[p + length] == b[t + length]
+                    and not marked_a[p + length]
+                    and not marked_b[t + length]
+                ):
+                    length += 1
+                if length > max_match:
+                    starts_a.clear()
+                    starts_b.clear()
+                    max_match = length
+                if length == max_match and length >= min_match:
+                    starts_a.append(p)
+                    starts_b.append(t)
+        
+        # Mark the tiles, skipping matches occluded by an earlier tile
+        for k in range(len(starts_a)):
+            p = starts_a[k]
+            t = starts_b[k]
+            occluded = False
+            for offset in range(max_match):
+                if marked_a[p + offset] or marked_b[t + offset]:
+                    occluded = True
+                    break
+            if not occluded:
+                for offset in range(max_match):
+                    marked_a[p + offset] = True
+                    marked_b[t + offset] = True
+                tiled += max_match
+    
+    return tiled
+
+
+# JIT-compile the kernel, unless this module itself was compiled (mypyc)
+GST_JIT_ENABLED = NUMBA_AVAILABLE and isinstance(_gst_tiled_length, FunctionType)
+if GST_JIT_ENABLED:
+    _gst_tiled_length = njit(cache=True)(_gst_tiled_length)
+
+
+def _gst_similarity(tokens1: List[str], tokens2: List[str], min_match: int) -> float:
+    """Greedy String Tiling similarity percentage of two token lists."""
+    # Map tokens to small ints so the kernel compares integers
+    vocabulary: Dict[str, int] = {}
+    ids1 = [vocabulary.setdefault(token, len(vocabulary)) for token in tokens1]
+    ids2 = [vocabulary.setdefault(token, len(vocabulary)) for token in tokens2]
+    if GST_JIT_ENABLED:
+        tiled = _gst_tiled_length(
+            np.array(ids1, dtype=np.int64), np.array(ids2, dtype=np.int64), min_match
+        )
+    else:
+        tiled = _gst_tiled_length(ids1, ids2, min_match)
+    return 200.0 * tiled / (len(tokens1) + len(tokens2))
+
+
+def _token_id_string(tokens: List[str], vocabulary: Dict[str, str]) -> str:
+    """
+    One character per token, numbering new tokens in vocabulary.
+    
+    Used by the "tokens" backend so SequenceMatcher compares whole tokens
+    (one element each) instead of the characters of the joined string.
+    Strings built with the same vocabulary can be compared.
+    """
+    for token in tokens:
+        if token not in vocabulary:
+            vocabulary[token] = chr(len(vocabulary))
+    return "".join(map(vocabulary.__getitem__, tokens))
+
+
+def _length_bound(len_a: int, len_b: int) -> float:
+    """
+    Upper bound (0-100) on the similarity of sequences of these lengths.
+    
+    Holds for SequenceMatcher.ratio() and Indel over characters, and for
+    Greedy String Tiling over tokens: at most min(len_a, len_b) elements
+    can be matched.
+    """
+    return 200.0 * min(len_a, len_b) / (len_a + len_b)
+
+
+def _similarity_ratio(
+    tokens1: List[str],
+    tokens2: List[str],
+    min_similarity: float = 0.0,
+    backend: str = "difflib",
+    gst_min_match: Optional[int] = None,
+) -> float:
+    """
+    Similarity percentage (0-100) of two token lists.
+    
+    The "difflib" backend uses SequenceMatcher.ratio(); "tokens" uses it
+    over whole tokens rather than characters (several times fewer elements,
+    different scores); "rapidfuzz" uses the Indel (LCS-based) similarity,
+    which is much faster and never lower; "gst" uses JPlag-style Greedy
+    String Tiling over tokens.
+    
+    If min_similarity is given, pairs that cannot reach it may skip the
+    full computation and return a lower value; the result is then only
+    meaningful as "below min_similarity". Pairs whose lengths alone rule
+    it out (see _length_bound) are rejected before any matching, and
+    identical token strings score 100 without any.
+    
+    gst_min_match defaults to Config.GST_MIN_MATCH_LENGTH.
+    """
+    if backend == "gst":
+        if min_similarity > 0.0:
+            length_bound = _length_bound(len(tokens1), len(tokens2))
+            if length_bound < min_similarity:
+                return length_bound
+        if gst_min_match is None:
+            gst_min_match = config.Config.GST_MIN_MATCH_LENGTH
+        return _gst_similarity(tokens1, tokens2, gst_min_match)
+    
+    if backend == "tokens":
+        vocabulary: Dict[str, str] = {}
+        token_str1 = _token_id_string(tokens1, vocabulary)
+        token_str2 = _token_id_string(tokens2, vocabulary)
+    else:
+        # Compare space-separated token strings
+        token_str1 = " ".join(tokens1)
+        token_str2 = " ".join(tokens2)
+    
+    if token_str1 == token_str2:
+        # Identical files: ratio() would match them completely anyway
+        return 100.0
+    
+    if backend == "rapidfuzz":
+        return Indel.normalized_similarity(
+            token_str1, token_str2, score_cutoff=min_similarity / 100.0
+        ) * 100.0
+    
+    if min_similarity > 0.0:
+        length_bound = _length_bound(len(token_str1), len(token_str2))
+        if length_bound < min_similarity:
+            return length_bound
+    
+    matcher = SequenceMatcher(None, token_str1, token_str2)
+    
+    if min_similarity > 0.0:
+        upper_bound = matcher.quick_ratio() * 100.0
+        if upper_bound < min_similarity:
+            return upper_bound
+    
+    return matcher.ratio() * 100.0
+
+
+def _column_similarities(
+    tokens_b: List[str],
+    token_lists_a: List[List[str]],
+    min_similarity: float = 0.0,
+    backend: str = "difflib",
+    gst_min_match: Optional[int] = None,
+) -> List[float]:
+    """
+    Similarity of each list in token_lists_a (first sequence) to tokens_b.
+    
+    With difflib (or tokens), tokens_b is set once as the matcher's second sequence, so
+    its b2j index and character counts are built once per column instead
+    of once per pair. See _similarity_ratio for the other arguments.
+    """
+    if not tokens_b:
+        return [0.0] * len(token_lists_a)
+    
+    similarities: List[float] = []
+    if backend != "difflib" and backend != "tokens":
+        for tokens_a in token_lists_a:
+            if not tokens_a:
+                similarities.append(0.0)
+                continue
+            similarities.append(_similarity_ratio(
+                tokens_a, tokens_b, min_similarity, backend, gst_min_match
+            ))
+        return similarities
+    
+    vocabulary: Dict[str, str] = {}
+    if backend == "tokens":
+        token_str_b = _token_id_string(tokens_b, vocabulary)
+    else:
+        token_str_b = " ".join(tokens_b)
+    # ASCII token strings are matched as bytes: same scores, cheaper elements
+    b_is_ascii = token_str_b.isascii()
+    matcher: Any = SequenceMatcher(None)
+    matcher.set_seq2(token_str_b.encode("ascii") if b_is_ascii else token_str_b)
+    
+    for tokens_a in token_lists_a:
+        if not tokens_a:
+            similarities.append(0.0)
+            continue
+        
+        if backend == "tokens":
+            token_str_a = _token_id_string(tokens_a, vocabulary)
+        else:
+            token_str_a = " ".join(tokens_a)
+        if token_str_a == token_str_b:
+            similarities.append(100.0)
+            continue
+        if min_similarity > 0.0:
+            # Skip pairs whose lengths alone rule out the threshold
+            length_bound = _length_bound(len(token_str_a), len(token_str_b))
+            if length_bound < min_similarity:
+                similarities.append(length_bound)
+                continue
+        
+        if b_is_ascii and not token_str_a.isascii():
+            # Mixed pair: compare as text, without the shared index
+            similarities.append(_similarity_ratio(
+                tokens_a, tokens_b, min_similarity, backend
+            ))
+            continue
+        
+        matcher.set_seq1(token_str_a.encode("ascii") if b_is_ascii else token_str_a)
+        if min_similarity > 0.0:
+            upper_bound = matcher.quick_ratio() * 100.0
+            if upper_bound < min_similarity:
+                similarities.append(upper_bound)
+                continue
+        similarities.append(matcher.ratio() * 100.0)
+    
+    return similarities
+
+
+def _dedupe_pairs(
+    sequence_ids: List[int],
+    candidates: Optional[List[List[int]]] = None,
+) -> Tuple[List[List[int]], List[Tuple[int, int, int, int]]]:
+    """
+    Keep one pair per (sequence of i, sequence of j) among the pairs to compare.
+    
+    Identical token sequences (direct copies, trivial programs) make
+    many pairs repeat an earlier comparison exactly; those are copied
+    from the first pair with the same sequences instead.
+    
+    Args:
+        sequence_ids: Sequence id of each file (see PlagiarismDetector._sequence_id)
+        candidates: For each file j, the files i < j to compare (all if None)
+    
+    Returns:
+        (for each file j, the files i < j to compare,
+         (i, j, i0, j0) for each pair whose score is that of pair (i0, j0))
+    """
+    first_pairs: Dict[Tuple[int, int], Tuple[int, int]] = {}
+    kept_candidates: List[List[int]] = []
+    duplicate_pairs: List[Tuple[int, int, int, int]] = []
+    for j, id_j in enumerate(sequence_ids):
+        kept: List[int] = []
+        for i in range(j) if candidates is None else candidates[j]:
+            first = first_pairs.setdefault((sequence_ids[i], id_j), (i, j))
+            if first == (i, j):
+                kept.append(i)
+            else:
+                duplicate_pairs.append((i, j, first[0], first[1]))
+        kept_candidates.append(kept)
+    return kept_candidates, duplicate_pairs
+
+
+# Mersenne prime modulus for the MinHash permutations
+_MINHASH_PRIME = (1 << 61) - 1
+
+
+def _minhash_signature(
+    tokens: List[str],
+    shingle_size: int,
+    permutations: List[Tuple[int, int]],
+) -> Tuple[int, ...]:
+    """MinHash signature of a token list's k-shingles (k = shingle_size)."""
+    num_shingles = max(1, len(tokens) - shingle_size + 1)
+    hashes = {
+        zlib.crc32(" ".join(tokens[k:k + shingle_size]).encode("utf-8"))
+        for k in range(num_shingles)
+    }
+    return tuple(
+        min((a * h + b) % _MINHASH_PRIME for h in hashes)
+        for a, b in permutations
+    )
+
+
+def _minhash_candidates(
+    token_lists: List[List[str]],
+    shingle_size: int,
+    num_perm: int,
+    bands: int,
+) -> List[List[int]]:
+    """
+    MinHash-LSH candidate files for each file of a question.
+    
+    Files whose shingle sets have a high Jaccard similarity share at least
+    one band of their signatures with high probability; only those pairs
+    are worth an exact comparison. The filter is probabilistic, so a
+    similar pair can occasionally be missed.
+    
+    Returns:
+        For each file j, the ascending indices i < j of its candidates
+    """
+    rng = random.Random(0)
+    permutations = [
+        (rng.randrange(1, _MINHASH_PRIME), rng.randrange(_MINHASH_PRIME))
+        for _ in range(num_perm)
+    ]
+    rows = max(1, num_perm // bands)
+    
+    buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = defaultdict(list)
+    for i, tokens in enumerate(token_lists):
+        signature = _minhash_signature(tokens, shingle_size, permutations)
+        for band in range(bands):
+            buckets[(band, signature[band * rows:(band + 1) * rows])].append(i)
+    
+    candidate_sets: List[Set[int]] = [set() for _ in token_lists]
+    for members in buckets.values():
+        for position, j in enumerate(members):
+            candidate_sets[j].update(members[:position])
+    
+    return [sorted(candidates) for candidates in candidate_sets]
+
+
+# Token lists of the question being compared, set once per worker process
+_worker_tokens: List[List[str]] = []
+_worker_min_similarity: float = 0.0
+_worker_backend: str = "difflib"
+_worker_gst_min_match: Optional[int] = None
+_worker_candidates: Optional[List[List[int]]] = None
+
+
+def _init_comparison_worker(
+    token_lists: List[List[str]],
+    min_similarity: float,
+    backend: str,
+    gst_min_match: int,
+    candidates: Optional[List[List[int]]] = None,
+) -> None:
+    """Store the question's token lists in a comparison worker process."""
+    global _worker_tokens, _worker_min_similarity, _worker_backend
+    global _worker_gst_min_match, _worker_candidates
+    _worker_tokens = token_lists
+    _worker_min_similarity = min_similarity
+    _worker_backend = backend
+    # Spawned workers re-import config, so carry over the parent's setting
+    _worker_gst_min_match = gst_min_match
+    _worker_candidates = candidates
+
+
+def _compare_column(j: int) -> List[Tuple[int, float]]:
+    """
+    Compare every earlier file of the question against file j (worker process).
+
+    Only pairs at or above the threshold are sent back, which keeps the
+    result traffic proportional to the matches rather than to n².
+
+    Returns:
+        (i, similarity) for each file i < j that reaches the threshold
+    """
+    if _worker_candidates is None:
+        compared: List[int] = list(range(j))
+    else:
+        compared = _worker_candidates[j]
+    similarities = _column_similarities(
+        _worker_tokens[j],
+        [_worker_tokens[i] for i in compared],
+        _worker_min_similarity,
+        _worker_backend,
+        _worker_gst_min_match,
+    )
+    return [
+        (i, similarity)
+        for i, similarity in zip(compared, similarities)
+        if similarity >= _worker_min_similarity
+    ]
+
+
+def _print_progress(previous_count: int, comparison_count: int, total: int) -> None:
+    """Report progress when the count passes a multiple of PROGRESS_INTERVAL."""
+    if comparison_count // PROGRESS_INTERVAL > previous_count // PROGRESS_INTERVAL:
+        print(f"    [+] {comparison_count}/{total} comparisons completed...")
 
 
 class PlagiarismDetector:
@@ -30,7 +492,7 @@ class PlagiarismDetector:
     - Token stream-based comparison (not raw text)
     - Template subtraction to remove boilerplate
     - Question-isolated comparisons (no cross-question contamination)
-    - Accurate similarity scoring using SequenceMatcher
+    - Accurate similarity scoring using SequenceMatcher (or rapidfuzz)
     """
 
     def __init__(
@@ -46,17 +508,65 @@ class PlagiarismDetector:
             mode: Tokenization mode ("structural" or "literal")
         """
         self.tokenizer = tokenizer.CTokenizer()
-        self.similarity_cache: Dict[Tuple[str, str], float] = {}
+        # Similarity per ordered pair of sequence ids (see _sequence_id):
+        # ratio() is not symmetric, so (a, b) and (b, a) are kept apart
+        self.similarity_cache: Dict[Tuple[int, int], float] = {}
+        self.sequence_ids: Dict[Tuple[str, ...], int] = {}
+        # Sequence id per token list object (the list is kept alive here)
+        self._sequence_ids_by_list: Dict[int, Tuple[List[str], int]] = {}
+        # Tokens per file path (None if the file is not valid for comparison)
+        self.token_cache: Dict[str, Optional[List[str]]] = {}
         self.template_tokens = template_tokens
+        # Template joined once, for subtraction from every file
+        self._template_str = " ".join(template_tokens) if template_tokens else ""
         self.mode = mode
+        
+        self.backend = config.Config.SIMILARITY_BACKEND
+        if self.backend == "rapidfuzz" and not RAPIDFUZZ_AVAILABLE:
+            print(
+                "[WARN] rapidfuzz is not installed, using difflib for similarity: "
+                "pip install rapidfuzz"
+            )
+            self.backend = "difflib"
+        elif self.backend == "gst" and not NUMBA_AVAILABLE:
+            print(
+                "[WARN] numba is not installed, Greedy String Tiling will run "
+                "in pure Python (slow): pip install numba"
+            )
 
-    def _calculate_similarity(self, tokens1: List[str], tokens2: List[str]) -> float:
+    def _sequence_id(self, tokens: List[str]) -> int:
+        """
+        Return a small integer id shared by all identical token sequences.
+        
+        Keeps similarity cache keys tiny instead of holding two joined
+        token strings per compared pair. A token list seen before is
+        looked up by object identity, without hashing its contents again.
+        """
+        entry = self._sequence_ids_by_list.get(id(tokens))
+        if entry is not None and entry[0] is tokens:
+            return entry[1]
+        
+        sequence_id = self.sequence_ids.setdefault(tuple(tokens), len(self.sequence_ids))
+        self._sequence_ids_by_list[id(tokens)] = (tokens, sequence_id)
+        return sequence_id
+
+    def _calculate_similarity(
+        self,
+        tokens1: List[str],
+        tokens2: List[str],
+        min_similarity: float = 0.0,
+    ) -> float:
         """
         Calculate similarity between two token lists using SequenceMatcher.
         
+        The score of (tokens1, tokens2) can differ from that of the
+        reversed pair, and each orientation is cached separately.
+        
         Args:
             tokens1: First token list
             tokens2: Second token list
+            min_similarity: Only scores at or above this value need to be
+                exact; lower ones may be returned as a cheaper upper bound
         
         Returns:
             Similarity percentage (0-100)
@@ -64,29 +574,29 @@ class PlagiarismDetector:
         if not tokens1 or not tokens2:
             return 0.0
         
-        # Create cache key (sorted for symmetry)
-        cache_key = tuple(sorted([
-            " ".join(tokens1),
-            " ".join(tokens2)
-        ]))
+        # Cache key in argument order: the score depends on which
+        # sequence is first, so a reversed pair is computed on its own
+        cache_key = (self._sequence_id(tokens1), self._sequence_id(tokens2))
         
         if cache_key in self.similarity_cache:
             return self.similarity_cache[cache_key]
         
-        # Use SequenceMatcher on token lists
-        # Convert to strings for SequenceMatcher (space-separated)
-        token_str1 = " ".join(tokens1)
-        token_str2 = " ".join(tokens2)
-        
-        # Calculate ratio
-        similarity = SequenceMatcher(None, token_str1, token_str2).ratio()
-        similarity_percent = similarity * 100.0
+        similarity_percent = _similarity_ratio(
+            tokens1, tokens2, min_similarity, self.backend
+        )
         
-        # Cache result
-        self.similarity_cache[cache_key] = similarity_percent
+        # Cache exact results only (a rejected pair returns an upper bound)
+        if similarity_percent >= min_similarity:
+            self._cache_similarity(cache_key, similarity_percent)
         
         return similarity_percent
 
+    def _cache_similarity(self, cache_key: Tuple[int, int], similarity: float) -> None:
+        """Store a pair similarity, evicting the oldest entry when full."""
+        if len(self.similarity_cache) >= SIMILARITY_CACHE_MAX_SIZE:
+            del self.similarity_cache[next(iter(self.similarity_cache))]
+        self.similarity_cache[cache_key] = similarity
+
     def _is_valid_for_comparison(
         self, file_path: str
     ) -> Tuple[bool, Optional[List[str]]]:
@@ -102,33 +612,77 @@ class PlagiarismDetector:
         if not os.path.exists(file_path):
             return False, None
         
+        student_tokens = self._tokenize_if_valid(file_path)
+        return student_tokens is not None, student_tokens
+
+    def _tokenize_if_valid(self, file_path: str) -> Optional[List[str]]:
+        """
+        Return the tokens of an existing file, or None if it is not valid.
+        
+        Skips the existence check of _is_valid_for_comparison, for paths
+        that were just listed from their directory.
+        """
+        # Each file is read and tokenized at most once per detector
+        if file_path in self.token_cache:
+            return self.token_cache[file_path]
+        
+        student_tokens = self._tokenize_file(file_path)
+        self.token_cache[file_path] = student_tokens
+        return student_tokens
+
+    def _tokenize_file(self, file_path: str) -> Optional[List[str]]:
+        """
+        Read and tokenize a file, applying template subtraction.
+        
+        Args:
+            file_path: Path to C file
+        
+        Returns:
+            Token list, or None if the file is unreadable or too short
+        """
+        min_tokens = config.Config.MIN_TOKEN_COUNT
+        
         try:
             with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
                 code = f.read()
             
+            # Fewer characters than min_tokens cannot hold enough tokens
+            if len(code) < min_tokens:
+                return None
+            
             # Tokenize to list
             student_tokens = self.tokenizer.tokenize_to_list(code, mode=self.mode)
-            
-            # Check minimum token count
-            if len(student_tokens) < config.Config.MIN_TOKEN_COUNT:
-                return False, None
-            
-            # Apply template subtraction if template exists
-            if self.template_tokens and student_tokens:
-                student_tokens = self.tokenizer.subtract_template_tokens(
-                    student_tokens,
-                    self.template_tokens
-                )
-                
-                # Re-check token count after template subtraction
-                if len(student_tokens) < config.Config.MIN_TOKEN_COUNT:
-                    return False, None
-            
-            return True, student_tokens
+            return self._comparable_tokens(student_tokens)
         
         except Exception as e:
             print(f"[WARN] Error processing file {file_path}: {str(e)}")
-            return False, None
+            return None
+
+    def _comparable_tokens(self, student_tokens: List[str]) -> Optional[List[str]]:
+        """
+        Apply the minimum token count and template subtraction to a file's tokens.
+        
+        Returns:
+            Token list, or None if the file is too short
+        """
+        min_tokens = config.Config.MIN_TOKEN_COUNT
+        
+        # Check minimum token count
+        if len(student_tokens) < min_tokens:
+            return None
+        
+        # Apply template subtraction if template exists
+        if self._template_str and student_tokens:
+            student_tokens = self.tokenizer.subtract_template_str(
+                student_tokens,
+                self._template_str
+            )
+            
+            # Re-check token count after template subtraction
+            if len(student_tokens) < min_tokens:
+                return None
+        
+        return student_tokens
 
     def compare_two_files(self, file1_path: str, file2_path: str) -> float:
         """
@@ -165,62 +719,266 @@ class PlagiarismDetector:
         Returns:
             List of plagiarism cases
         """
-        plagiarism_cases: List[Dict] = []
+        return list(self.iter_plagiarism_in_question(question_dir, question_num))
+
+    def iter_plagiarism_in_question(
+        self, question_dir: str, question_num: int
+    ) -> Iterator[Dict]:
+        """
+        Yield the plagiarism cases of a question as they are found.
+        
+        Same as detect_plagiarism_in_question, without building a
+        per-question list.
+        
+        Args:
+            question_dir: Directory containing files for this question
+            question_num: Question number
         
+        Yields:
+            Plagiarism cases, in (file i, file j) order
+        """
         if not os.path.exists(question_dir):
-            return plagiarism_cases
-        
-        # Collect all valid student files for this question
-        student_files: Dict[str, str] = {}
-        for file_name in os.listdir(question_dir):
-            if file_name.endswith(tuple(config.Config.ACCEPTED_EXTENSIONS)):
-                student_id = os.path.splitext(file_name)[0]
-                file_path = os.path.join(question_dir, file_name)
-                
-                is_valid, _ = self._is_valid_for_comparison(file_path)
-                if is_valid:
-                    student_files[student_id] = file_path
+            return
+        
+        accepted_extensions = tuple(config.Config.ACCEPTED_EXTENSIONS)
+        
+        # Collect the student files of this question
+        candidates: List[Tuple[str, str]] = []
+        with os.scandir(question_dir) as entries:
+            for entry in entries:
+                # is_file() uses the type cached by scandir (no extra stat)
+                if entry.name.endswith(accepted_extensions) and entry.is_file():
+                    student_id = os.path.splitext(entry.name)[0]
+                    candidates.append((student_id, entry.path))
+        
+        # Tokenize the new files: many in a process pool, a few serially
+        # (tokenizing is CPU-bound Python; threads would only contend for
+        # the GIL)
+        candidate_paths = [file_path for _, file_path in candidates]
+        new_paths = [
+            file_path for file_path in candidate_paths
+            if file_path not in self.token_cache
+        ]
+        if len(new_paths) >= tokenizer.PARALLEL_MIN_FILES:
+            token_lists_by_path = tokenizer.tokenize_files_batch(new_paths, self.mode)
+            for file_path, file_tokens in token_lists_by_path.items():
+                self.token_cache[file_path] = self._comparable_tokens(file_tokens)
+        else:
+            for file_path in new_paths:
+                self.token_cache[file_path] = self._tokenize_file(file_path)
+        results = [self.token_cache[file_path] for file_path in candidate_paths]
         
-        if len(student_files) < 2:
+        # Keep only valid files (and their tokens), in directory order
+        student_entries: Dict[str, Tuple[str, List[str]]] = {}
+        for (student_id, file_path), tokens in zip(candidates, results):
+            if tokens is not None:
+                student_entries[student_id] = (file_path, tokens)
+        
+        if len(student_entries) < 2:
             # Need at least 2 files to compare
-            return plagiarism_cases
+            return
         
         # Compare all pairs of files (only within this question)
-        student_ids = list(student_files.keys())
+        student_ids = list(student_entries)
+        file_paths = [file_path for file_path, _ in student_entries.values()]
+        token_lists = [tokens for _, tokens in student_entries.values()]
         total_comparisons = len(student_ids) * (len(student_ids) - 1) // 2
         
         print(
             f"  [INFO] Comparing {total_comparisons} file pairs for question {question_num}..."
         )
         
+        for i, j, similarity in self._iter_similar_pairs(token_lists):
+            yield {
+                "question": question_num,
+                "student1": student_ids[i],
+                "student2": student_ids[j],
+                "similarity": round(similarity, 2),
+                "file1": file_paths[i],
+                "file2": file_paths[j],
+            }
+
+    def _iter_similar_pairs(
+        self, token_lists: List[List[str]]
+    ) -> Iterator[Tuple[int, int, float]]:
+        """
+        Yield (i, j, similarity) for each pair i < j at or above the threshold.
+        
+        Pairs come in (i, j) order. Lower scores are never kept, so memory
+        grows with the matches rather than with n².
+        
+        Pairs are computed column by column (every earlier file against
+        file j) so each file's SequenceMatcher index is built once. Large
+        questions are compared in a process pool (one column per task,
+        token lists sent once per worker); small ones, or any failure to
+        start the pool, fall back to the in-process cached path.
+        
+        The rapidfuzz backend scores the question in cdist calls instead.
+        """
+        n = len(token_lists)
+        total_pairs = n * (n - 1) // 2
+        threshold = config.Config.SIMILARITY_THRESHOLD
+        
+        if self.backend == "rapidfuzz":
+            yield from self._rapidfuzz_similar_pairs(token_lists, threshold)
+            return
+        
+        # Optionally compare only MinHash-LSH candidate pairs (others score 0)
+        candidates: Optional[List[List[int]]] = None
+        if config.Config.MINHASH_PREFILTER:
+            candidates = _minhash_candidates(
+                token_lists,
+                config.Config.MINHASH_SHINGLE_SIZE,
+                config.Config.MINHASH_NUM_PERM,
+                config.Config.MINHASH_BANDS,
+            )
+            num_candidates = sum(len(column) for column in candidates)
+            print(
+                f"    [INFO] MinHash prefilter kept {num_candidates}/{total_pairs} pairs"
+            )
+        
+        # Compare each pair of distinct sequences once (copies share scores)
+        sequence_ids = [self._sequence_id(tokens) for tokens in token_lists]
+        duplicate_pairs: List[Tuple[int, int, int, int]] = []
+        if len(set(sequence_ids)) < n:
+            candidates, duplicate_pairs = _dedupe_pairs(sequence_ids, candidates)
+        
+        matches = self._similar_pairs_by_column(token_lists, sequence_ids, candidates)
+        if duplicate_pairs:
+            # A copied pair matches exactly when its first pair does
+            similarities = {(i, j): similarity for i, j, similarity in matches}
+            for i, j, i0, j0 in duplicate_pairs:
+                similarity = similarities.get((i0, j0))
+                if similarity is not None:
+                    matches.append((i, j, similarity))
+        
+        matches.sort()
+        yield from matches
+
+    def _similar_pairs_by_column(
+        self,
+        token_lists: List[List[str]],
+        sequence_ids: List[int],
+        candidates: Optional[List[List[int]]],
+    ) -> List[Tuple[int, int, float]]:
+        """
+        Compare candidate files i < j against file j, for every file j.
+        
+        Progress is printed as columns complete (column j covers the j
+        pairs of file j, compared or not).
+        
+        Returns:
+            (i, j, similarity) for the compared pairs at or above the
+            threshold, column by column
+        """
+        n = len(token_lists)
+        total_pairs = n * (n - 1) // 2
+        threshold = config.Config.SIMILARITY_THRESHOLD
+        workers = config.Config.COMPARISON_WORKERS or os.cpu_count() or 1
+        
+        if workers > 1 and total_pairs >= config.Config.PARALLEL_MIN_PAIRS:
+            try:
+                with ProcessPoolExecutor(
+                    max_workers=workers,
+                    initializer=_init_comparison_worker,
+                    initargs=(
+                        token_lists,
+                        threshold,
+                        self.backend,
+                        config.Config.GST_MIN_MATCH_LENGTH,
+                        candidates,
+                    ),
+                ) as executor:
+                    # Longest columns first, a few per task, to balance the
+                    # workers without one IPC round trip per column
+                    column_order = range(n - 1, 0, -1)
+                    matches: List[Tuple[int, int, float]] = []
+                    comparison_count = 0
+                    for j, column_matches in zip(column_order, executor.map(
+                        _compare_column,
+                        column_order,
+                        chunksize=max(1, n // (workers * 4)),
+                    )):
+                        matches.extend((i, j, similarity) for i, similarity in column_matches)
+                        _print_progress(comparison_count, comparison_count + j, total_pairs)
+                        comparison_count += j
+                return matches
+            except Exception as e:
+                print(f"    [WARN] Parallel comparison unavailable, running serially: {e}")
+        
+        similarity_cache = self.similarity_cache
+        matches = []
         comparison_count = 0
-        for i in range(len(student_ids)):
-            for j in range(i + 1, len(student_ids)):
-                student1_id = student_ids[i]
-                student2_id = student_ids[j]
-                
-                file1_path = student_files[student1_id]
-                file2_path = student_files[student2_id]
-                
-                similarity = self.compare_two_files(file1_path, file2_path)
-                
-                if similarity >= config.Config.SIMILARITY_THRESHOLD:
-                    plagiarism_cases.append({
-                        "question": question_num,
-                        "student1": student1_id,
-                        "student2": student2_id,
-                        "similarity": round(similarity, 2),
-                        "file1": file1_path,
-                        "file2": file2_path,
-                    })
-                
-                comparison_count += 1
-                if comparison_count % 50 == 0:
-                    print(
-                        f"    [+] {comparison_count}/{total_comparisons} comparisons completed..."
-                    )
+        for j in range(n):
+            id_j = sequence_ids[j]
+            
+            # Compute only the pairs not already cached (keys are built
+            # for the compared pairs only, and kept for the misses)
+            missing: List[int] = []
+            missing_keys: List[Tuple[int, int]] = []
+            for i in range(j) if candidates is None else candidates[j]:
+                # Same orientation as _calculate_similarity(file i, file j)
+                cache_key = (sequence_ids[i], id_j)
+                cached = similarity_cache.get(cache_key)
+                if cached is None:
+                    missing.append(i)
+                    missing_keys.append(cache_key)
+                elif cached >= threshold:
+                    matches.append((i, j, cached))
+            computed = _column_similarities(
+                token_lists[j],
+                [token_lists[i] for i in missing],
+                threshold,
+                self.backend,
+            )
+            for i, cache_key, similarity in zip(missing, missing_keys, computed):
+                # Only exact results reach the threshold (see
+                # _calculate_similarity); those are cached and kept
+                if similarity >= threshold:
+                    self._cache_similarity(cache_key, similarity)
+                    matches.append((i, j, similarity))
+            _print_progress(comparison_count, comparison_count + j, total_pairs)
+            comparison_count += j
         
-        return plagiarism_cases
+        return matches
+
+    def _rapidfuzz_similar_pairs(
+        self, token_lists: List[List[str]], threshold: float
+    ) -> Iterator[Tuple[int, int, float]]:
+        """
+        Yield (i, j, similarity) pairs at or above the threshold, via cdist.
+        
+        All pairs are scored in C++ by rapidfuzz's process.cdist
+        (multithreaded, with the threshold as score cutoff), so there is
+        no Python-level pair loop.
+        
+        Rows are scored a block at a time against the later files only,
+        so the lower half of the matrix is (almost) never computed and
+        memory stays proportional to the block, not to n².
+        """
+        token_strs = [" ".join(tokens) for tokens in token_lists]
+        n = len(token_strs)
+        total_pairs = n * (n - 1) // 2
+        comparison_count = 0
+        for start in range(0, n, RAPIDFUZZ_ROW_BLOCK):
+            stop = min(start + RAPIDFUZZ_ROW_BLOCK, n)
+            # Rows start .. stop-1 against files start+1 .. n-1
+            matrix = process.cdist(
+                token_strs[start:stop],
+                token_strs[start + 1:],
+                scorer=fuzz.ratio,
+                score_cutoff=threshold,
+                dtype=float,
+                workers=config.Config.COMPARISON_WORKERS or -1,
+            )
+            # Pairs of the rows scored so far (all but those among the rest)
+            block_count = total_pairs - (n - stop) * (n - stop - 1) // 2
+            _print_progress(comparison_count, block_count, total_pairs)
+            comparison_count = block_count
+            for i in range(start, stop):
+                for j, similarity in enumerate(matrix[i - start, i - start:].tolist(), start=i + 1):
+                    if similarity >= threshold:
+                        yield i, j, similarity
 
     def detect_plagiarism_all_questions(
         self, output_dir: str
@@ -249,15 +1007,15 @@ class PlagiarismDetector:
                 print(f"\n[INFO] Checking question {question_num}...")
                 
                 # Only compare files within this question directory
-                cases = self.detect_plagiarism_in_question(
-                    question_dir, question_num
+                num_cases_before = len(all_plagiarism_cases)
+                all_plagiarism_cases.extend(
+                    self.iter_plagiarism_in_question(question_dir, question_num)
                 )
+                num_cases = len(all_plagiarism_cases) - num_cases_before
                 
-                all_plagiarism_cases.extend(cases)
-                
-                if cases:
+                if num_cases:
                     print(
-                        f"  [WARN] {len(cases)} potential plagiarism cases detected"
+                        f"  [WARN] {num_cases} potential plagiarism cases detected"
                     )
                 else:
                     print("  [+] No plagiarism cases detected")
@@ -276,6 +1034,8 @@ class PlagiarismDetector:
         Returns:
             List of clusters (groups of students)
         """
+        if SCIPY_AVAILABLE:
+            return self._find_clusters_scipy(plagiarism_cases)
         if not NETWORKX_AVAILABLE:
             return self._find_clusters_simple(plagiarism_cases)
         
@@ -304,46 +1064,94 @@ class PlagiarismDetector:
         
         return clusters
 
+    def _find_clusters_scipy(self, plagiarism_cases: List[Dict]) -> List[Dict]:
+        """
+        Find clusters with scipy's sparse-graph connected components.
+        
+        Students are numbered in order of first appearance, so clusters
+        come out in the same order as with networkx.
+        """
+        student_ids: Dict[str, int] = {}
+        rows: List[int] = []
+        cols: List[int] = []
+        for case in plagiarism_cases:
+            rows.append(student_ids.setdefault(case["student1"], len(student_ids)))
+            cols.append(student_ids.setdefault(case["student2"], len(student_ids)))
+        
+        if not student_ids:
+            return []
+        
+        num_students = len(student_ids)
+        graph = csr_matrix(
+            ([1] * len(rows), (rows, cols)), shape=(num_students, num_students)
+        )
+        _, labels = connected_components(graph, directed=False)
+        
+        # Labels are numbered by each component's first student
+        components: Dict[int, List[str]] = {}
+        for student, label in zip(student_ids, labels.tolist()):
+            components.setdefault(label, []).append(student)
+        
+        clusters: List[Dict] = []
+        for component in components.values():
+            if len(component) > 1:
+                cluster_students = sorted(component)
+                clusters.append({
+                    "students": cluster_students,
+                    "size": len(cluster_students),
+                    "cluster_id": len(clusters) + 1,
+                })
+        
+        return clusters
+
     def _find_clusters_simple(self, plagiarism_cases: List[Dict]) -> List[Dict]:
         """
         Find clusters without networkx (fallback implementation).
         
-        Uses DFS to find connected components.
+        Uses an iterative union-find (path halving, union by size), so
+        large clusters cannot hit the recursion limit and no adjacency
+        sets are built.
         """
-        connections: Dict[str, Set[str]] = defaultdict(set)
+        # Students in order of first appearance, each initially its own root
+        parent: Dict[str, str] = {}
+        size: Dict[str, int] = {}
+        
+        def find(student: str) -> str:
+            while parent[student] != student:
+                parent[student] = parent[parent[student]]
+                student = parent[student]
+            return student
         
         for case in plagiarism_cases:
-            student1 = case["student1"]
-            student2 = case["student2"]
-            connections[student1].add(student2)
-            connections[student2].add(student1)
+            for student in (case["student1"], case["student2"]):
+                if student not in parent:
+                    parent[student] = student
+                    size[student] = 1
+            
+            root1 = find(case["student1"])
+            root2 = find(case["student2"])
+            if root1 != root2:
+                if size[root1] < size[root2]:
+                    root1, root2 = root2, root1
+                parent[root2] = root1
+                size[root1] += size[root2]
+        
+        # Group by root; components come out in order of their first student
+        components: Dict[str, List[str]] = {}
+        for student in parent:
+            components.setdefault(find(student), []).append(student)
         
-        visited: set = set()
         clusters: List[Dict] = []
         cluster_id = 1
         
-        def dfs(student: str, current_cluster: set):
-            """Depth-first search to find connected students."""
-            if student in visited:
-                return
-            visited.add(student)
-            current_cluster.add(student)
-            
-            for connected in connections[student]:
-                if connected not in visited:
-                    dfs(connected, current_cluster)
-        
-        for student in connections:
-            if student not in visited:
-                cluster = set()
-                dfs(student, cluster)
-                if len(cluster) > 1:
-                    clusters.append({
-                        "students": sorted(list(cluster)),
-                        "size": len(cluster),
-                        "cluster_id": cluster_id,
-                    })
-                    cluster_id += 1
+        for cluster in components.values():
+            if len(cluster) > 1:
+                clusters.append({
+                    "students": sorted(cluster),
+                    "size": len(cluster),
+                    "cluster_id": cluster_id,
+                })
+                cluster_id += 1
         
         return clusters
 
@@ -357,38 +1165,30 @@ class PlagiarismDetector:
         Returns:
             Dictionary with statistics
         """
+        # Split the cases into column arrays in a single pass
+        if plagiarism_cases:
+            questions, students1, students2, similarities = zip(
+                *map(_CASE_COLUMNS, plagiarism_cases)
+            )
+        else:
+            questions = students1 = students2 = similarities = ()
+        
+        # Bucket index 0 means below the lowest edge (not counted)
+        bucket_counts = Counter(
+            map(partial(bisect_right, SIMILARITY_BUCKET_EDGES), similarities)
+        )
+        
         stats: Dict = {
             "total_cases": len(plagiarism_cases),
-            "by_question": defaultdict(int),
-            "by_student": defaultdict(int),
+            "by_question": Counter(questions),
+            "by_student": Counter(chain.from_iterable(zip(students1, students2))),
             "similarity_distribution": {
-                "85-90": 0,
-                "90-95": 0,
-                "95-99": 0,
-                "99-100": 0,
+                label: bucket_counts[index]
+                for index, label in enumerate(SIMILARITY_BUCKET_LABELS, start=1)
             },
             "clusters": [],
         }
         
-        for case in plagiarism_cases:
-            # Statistics by question
-            stats["by_question"][case["question"]] += 1
-            
-            # Statistics by student
-            stats["by_student"][case["student1"]] += 1
-            stats["by_student"][case["student2"]] += 1
-            
-            # Similarity distribution
-            similarity = case["similarity"]
-            if 85 <= similarity < 90:
-                stats["similarity_distribution"]["85-90"] += 1
-            elif 90 <= similarity < 95:
-                stats["similarity_distribution"]["90-95"] += 1
-            elif 95 <= similarity < 99:
-                stats["similarity_distribution"]["95-99"] += 1
-            elif similarity >= 99:
-                stats["similarity_distribution"]["99-100"] += 1
-        
         stats["clusters"] = self.find_clusters(plagiarism_cases)
         
         return stats
@@ -411,13 +1211,33 @@ def load_template_tokens(
     if not template_path or not os.path.exists(template_path):
         return None
     
+    # Repeated runs reuse the tokens until the template file changes
+    try:
+        stat = os.stat(template_path)
+    except OSError as e:
+        print(f"[WARN] Error loading template file: {str(e)}")
+        return None
+    tokens = _load_template_tokens_cached(
+        template_path, stat.st_mtime_ns, stat.st_size, mode
+    )
+    return list(tokens) if tokens is not None else None
+
+
+@lru_cache(maxsize=16)
+def _load_template_tokens_cached(
+    template_path: str,
+    mtime_ns: int,
+    size: int,
+    mode: TokenizationMode,
+) -> Optional[Tuple[str, ...]]:
+    """Tokenize a template file (memoized per path, version and mode)."""
     try:
         tokenizer_instance = tokenizer.CTokenizer()
         with open(template_path, "r", encoding="utf-8", errors="ignore") as f:
             code = f.read()
         
         tokens = tokenizer_instance.tokenize_to_list(code, mode=mode)
-        return tokens if tokens else None
+        return tuple(tokens) if tokens else None
     except Exception as e:
         print(f"[WARN] Error loading template file: {str(e)}")
         return None
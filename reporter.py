@@ -5,99 +5,372 @@ Generates CSV, detailed text, HTML diff reports, and a log file.
 """
 
 import csv
+import gzip
+import heapq
+import io
+import json
 import os
+import sys
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
-from difflib import HtmlDiff
-from typing import Dict, List, Optional
+from collections import Counter
+from functools import partial
+from itertools import chain, groupby, repeat
+from operator import itemgetter
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import config
 
+# Try to import the compiled (Cython) port of difflib's HtmlDiff (optional,
+# same HTML)
+try:
+    from cydifflib import HtmlDiff
+    CYDIFFLIB_AVAILABLE = True
+except ImportError:
+    from difflib import HtmlDiff
+    CYDIFFLIB_AVAILABLE = False
+
+# Try to import orjson for fast JSON serialization (optional)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# gzip level for compressed HTML reports (fast, most of the size gain)
+HTML_GZIP_LEVEL = 3
+
+# Write buffer for report files (fewer, larger write() calls on big runs)
+REPORT_BUFFER_SIZE = 1 << 20
+
+# Fewer cases than this are written in-process (a pool costs more to start)
+PARALLEL_MIN_HTML_REPORTS = 16
+
+# Maximum number of files whose lines are kept for the HTML diffs (oldest
+# evicted first)
+SOURCE_LINES_CACHE_MAX_SIZE = 512
+
+# Fixed lines of the console summary, formatted once
+_CONSOLE_SUMMARY_HEADER = (
+    "\n" + "=" * 80,
+    "[SUMMARY] Plagiarism detection summary",
+    "=" * 80,
+)
+_CONSOLE_SAMPLE_HEADER = (
+    "\n[INFO] Sample of detected cases (first 10):",
+    "-" * 80,
+    f"{'Question':<8} {'Student 1':<15} {'Student 2':<15} {'Similarity %':<12}",
+    "-" * 80,
+)
+# One sampled case on the console, filled from _console_case_fields
+_CONSOLE_CASE_FORMAT = "Q{:<7} {:<15} {:<15} {:.2f}%".format
+_console_case_fields = itemgetter("question", "student1", "student2", "similarity")
+
+# One case in the detailed report, filled from _case_line_fields
+_CASE_LINE_FORMAT = "  • %s <-> %s: %.2f%%\n"
+_case_line_fields = itemgetter("student1", "student2", "similarity")
+
+# Source lines per file path, in an HTML report worker process
+_worker_source_lines: Dict[str, List[str]] = {}
+
+
+def _html_bytes(text: str) -> bytes:
+    """
+    Encode HTML the way a UTF-8 text-mode file would write it.
+    """
+    if os.linesep != "\n":
+        text = text.replace("\n", os.linesep)
+    return text.encode("utf-8")
+
+
+# Page around each diff table: HtmlDiff.make_file's template, with its
+# constant styles and legend filled in and encoded once instead of for
+# every case
+_HTML_HEAD, _HTML_TAIL = map(_html_bytes, (
+    HtmlDiff._file_template
+    % dict(
+        styles=HtmlDiff._styles,
+        legend=HtmlDiff._legend,
+        table="\0",
+        charset="utf-8",
+    )
+).split("\0"))
+
+# Shared by all HTML reports: make_table keeps no state between tables
+_HTML_DIFF = HtmlDiff(tabsize=4, wrapcolumn=80)
+
+
+def _read_source_lines(
+    file_path: str, source_lines: Dict[str, List[str]]
+) -> List[str]:
+    """
+    Return the lines of a student file, reading it only once per cache.
+
+    Student files are small, so a plain read is as fast as mapping them;
+    what matters is not reading a file again for every case it is in.
+    """
+    lines = source_lines.get(file_path)
+    if lines is None:
+        with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
+            lines = f.readlines()
+        if len(source_lines) >= SOURCE_LINES_CACHE_MAX_SIZE:
+            del source_lines[next(iter(source_lines))]
+        source_lines[file_path] = lines
+    return lines
+
+
+def _is_up_to_date(output_path: str, input_paths: List[str]) -> bool:
+    """
+    Whether output_path exists, is not empty and is newer than every input.
+
+    An empty output is one a killed run left behind and is not reused.
+    """
+    try:
+        output_stat = os.stat(output_path)
+        if not output_stat.st_size:
+            return False
+        output_mtime = output_stat.st_mtime_ns
+        return all(os.stat(path).st_mtime_ns < output_mtime for path in input_paths)
+    except OSError:
+        return False
+
+
+def _generate_html_diff(
+    case: Dict,
+    html_reports_dir: str,
+    source_lines: Dict[str, List[str]],
+    compress: bool = False,
+) -> Optional[str]:
+    """
+    Write the HTML side-by-side diff of one case and return its path.
+
+    A report left by an earlier run is kept if it is newer than both
+    source files.
+    """
+    try:
+        file1_path = case.get("file1")
+        file2_path = case.get("file2")
+
+        if not file1_path or not file2_path:
+            return None
+
+        html_filename = (
+            f"Q{case['question']}_{case['student1']}_vs_{case['student2']}.html"
+        )
+        html_path = os.path.join(html_reports_dir, html_filename)
+        if compress:
+            html_path += ".gz"
+
+        if _is_up_to_date(html_path, [file1_path, file2_path]):
+            return html_path
+
+        lines1 = _read_source_lines(file1_path, source_lines)
+        lines2 = _read_source_lines(file2_path, source_lines)
+
+        html_table = _HTML_DIFF.make_table(
+            lines1,
+            lines2,
+            fromdesc=f"Student: {case['student1']}",
+            todesc=f"Student: {case['student2']}",
+            context=True,
+            numlines=3,
+        )
+
+        # Written piece by piece: no page-sized copy of a large table
+        html_parts = (_HTML_HEAD, _html_bytes(html_table), _HTML_TAIL)
+        del html_table
+
+        if compress:
+            # The tables are very repetitive and compress ~10x
+            with gzip.open(html_path, "wb", compresslevel=HTML_GZIP_LEVEL) as f:
+                f.writelines(html_parts)
+        else:
+            with open(html_path, "wb") as f:
+                f.writelines(html_parts)
+
+        return html_path
+
+    except Exception as exc:  # pragma: no cover - defensive logging
+        print(f"  ⚠ Error generating HTML diff: {exc}")
+        return None
+
+
+def _generate_html_diff_in_worker(
+    case: Dict, html_reports_dir: str, table_number: int, compress: bool
+) -> Optional[str]:
+    """
+    Write the HTML diff of one case in a report worker process.
+
+    HtmlDiff numbers the anchors of each table with a class-level counter;
+    setting it to the case's position gives the same HTML as a serial run.
+    """
+    HtmlDiff._default_prefix = table_number
+    return _generate_html_diff(
+        case, html_reports_dir, _worker_source_lines, compress
+    )
+
+
+def _sort_cases(plagiarism_cases: List[Dict]) -> List[Dict]:
+    """
+    Sort cases by question, then by decreasing similarity (stable).
+    """
+    by_similarity = sorted(
+        plagiarism_cases, key=itemgetter("similarity"), reverse=True
+    )
+    return sorted(by_similarity, key=itemgetter("question"))
+
+
+def _join_cluster_students(clusters: List[Dict]) -> List[str]:
+    """
+    Return each cluster's students as the ", "-separated list the reports show.
+    """
+    return [", ".join(cluster["students"]) for cluster in clusters]
+
+
+def _relative_report_path(
+    report_path: str, relative_dirs: Dict[str, str]
+) -> str:
+    """
+    Return report_path relative to the output directory.
+
+    relative_dirs caches the relative form of each report directory, as
+    all reports share one: a single relpath() call instead of one per row.
+    """
+    if not report_path:
+        return report_path
+    report_dir, report_name = os.path.split(report_path)
+    relative_dir = relative_dirs.get(report_dir)
+    if relative_dir is None:
+        relative_dir = os.path.relpath(
+            report_dir or os.curdir, config.Config.OUTPUT_DIR
+        )
+        relative_dirs[report_dir] = relative_dir
+    if relative_dir == os.curdir:
+        return report_name
+    return os.path.join(relative_dir, report_name)
+
+
+def _csv_text(rows: Iterable[Tuple[str, ...]]) -> str:
+    """
+    Format rows exactly as csv.writer would, as one string.
+
+    Rows without commas, quotes or line breaks are joined directly; only the
+    others go through csv.writer to be quoted.
+    """
+    lines = []
+    quoted_line = io.StringIO()
+    quoting_writer = csv.writer(quoted_line)
+    for row in rows:
+        line = ",".join(row)
+        if (
+            line.count(",") != len(row) - 1
+            or '"' in line
+            or "\r" in line
+            or "\n" in line
+        ):
+            quoted_line.seek(0)
+            quoted_line.truncate()
+            quoting_writer.writerow(row)
+            # Less its "\r\n" terminator, added by the join below
+            line = quoted_line.getvalue()[:-2]
+        lines.append(line)
+    lines.append("")
+    return "\r\n".join(lines)
+
 
 class Reporter:
     def __init__(self) -> None:
         self.report_file = config.Config.get_report_file_path()
         self.html_reports_dir = config.Config.get_html_reports_dir()
-        os.makedirs(self.html_reports_dir, exist_ok=True)
+        # Created on the first HTML report, not for runs that write none
+        self._html_dir_ready = False
+        # Source lines per file path, read once for all the cases it is in
+        self._source_lines: Dict[str, List[str]] = {}
 
     def print_console_summary(
         self,
         plagiarism_cases: List[Dict],
         statistics: Dict,
+        cluster_students: Optional[List[str]] = None,
     ) -> None:
         """
         Print a concise plagiarism summary to the console.
+
+        cluster_students, if given, are the clusters' students already joined.
         """
         if not config.Config.CONSOLE_OUTPUT_ENABLED:
             return
 
-        print("\n" + "=" * 80)
-        print("[SUMMARY] Plagiarism detection summary")
-        print("=" * 80)
+        # Collect the lines and write them at once
+        out: List[str] = list(_CONSOLE_SUMMARY_HEADER)
 
         total_cases = statistics.get("total_cases", 0)
-        print("\n[STATS] Overall statistics:")
-        print(f"  - Total potential plagiarism cases: {total_cases}")
+        out.append("\n[STATS] Overall statistics:")
+        out.append(f"  - Total potential plagiarism cases: {total_cases}")
 
         by_question = statistics.get("by_question") or {}
         if by_question:
-            print("\n[STATS] Cases by question:")
+            out.append("\n[STATS] Cases by question:")
             for question_num in sorted(by_question.keys()):
                 count = by_question[question_num]
-                print(f"  - Question {question_num}: {count} case(s)")
+                out.append(f"  - Question {question_num}: {count} case(s)")
 
         similarity_dist = statistics.get("similarity_distribution") or {}
         if similarity_dist:
-            print("\n[STATS] Similarity distribution:")
+            out.append("\n[STATS] Similarity distribution:")
             for range_name, count in similarity_dist.items():
                 if count > 0:
-                    print(f"  - {range_name}%: {count} case(s)")
+                    out.append(f"  - {range_name}%: {count} case(s)")
 
         by_student = statistics.get("by_student") or {}
         if by_student:
-            print("\n[WARN] Students with the most flagged pairs:")
-            sorted_students = sorted(
-                by_student.items(), key=lambda x: x[1], reverse=True
-            )[:10]
+            out.append("\n[WARN] Students with the most flagged pairs:")
+            # Same as sorting by count (descending) and keeping 10, ties included
+            sorted_students = heapq.nlargest(
+                10, by_student.items(), key=itemgetter(1)
+            )
             for student_id, count in sorted_students:
-                print(f"  - {student_id}: {count} case(s)")
+                out.append(f"  - {student_id}: {count} case(s)")
 
         clusters = statistics.get("clusters") or {}
         if clusters:
-            print("\n[INFO] Detected plagiarism clusters:")
-            for cluster in clusters:
-                students_str = ", ".join(cluster["students"])
-                print(
+            out.append("\n[INFO] Detected plagiarism clusters:")
+            if cluster_students is None:
+                cluster_students = _join_cluster_students(clusters)
+            for cluster, students_str in zip(clusters, cluster_students):
+                out.append(
                     f"  - Cluster #{cluster['cluster_id']}: "
                     f"{cluster['size']} students - [{students_str}]"
                 )
 
         if plagiarism_cases:
-            print("\n[INFO] Sample of detected cases (first 10):")
-            print("-" * 80)
-            print(
-                f"{'Question':<8} {'Student 1':<15} "
-                f"{'Student 2':<15} {'Similarity %':<12}"
-            )
-            print("-" * 80)
+            out.extend(_CONSOLE_SAMPLE_HEADER)
 
-            for case in plagiarism_cases[:10]:
-                print(
-                    f"Q{case['question']:<7} {case['student1']:<15} "
-                    f"{case['student2']:<15} {case['similarity']:.2f}%"
-                )
+            out.extend(
+                _CONSOLE_CASE_FORMAT(*_console_case_fields(case))
+                for case in plagiarism_cases[:10]
+            )
 
             if len(plagiarism_cases) > 10:
-                print(f"\n  ... and {len(plagiarism_cases) - 10} more case(s)")
+                out.append(f"\n  ... and {len(plagiarism_cases) - 10} more case(s)")
 
-        print("\n" + "=" * 80)
+        out.append("\n" + "=" * 80)
+
+        sys.stdout.write("\n".join(out) + "\n")
 
     def generate_detailed_report(
         self,
         plagiarism_cases: List[Dict],
         statistics: Dict,
+        sorted_cases: Optional[List[Dict]] = None,
+        cluster_students: Optional[List[str]] = None,
     ) -> bool:
         """
         Generate a detailed text report summarizing all detected cases.
+
+        sorted_cases, if given, are the cases already in report order, and
+        cluster_students the clusters' students already joined.
         """
         try:
             report_path = os.path.join(
@@ -105,66 +378,63 @@ class Reporter:
                 "Detailed_Report.txt",
             )
 
-            with open(report_path, "w", encoding="utf-8") as f:
-                f.write("=" * 80 + "\n")
-                f.write("Detailed plagiarism report\n")
-                f.write("=" * 80 + "\n")
-                f.write(
-                    f"Generated at: "
-                    f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+            # Build the whole report in memory and write it at once
+            parts: List[str] = [
+                "=" * 80 + "\n",
+                "Detailed plagiarism report\n",
+                "=" * 80 + "\n",
+                f"Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n",
+                f"Similarity threshold: {config.Config.SIMILARITY_THRESHOLD}%\n",
+                f"Minimum token count: {config.Config.MIN_TOKEN_COUNT}\n",
+                "\n" + "=" * 80 + "\n\n",
+            ]
+
+            total_cases = statistics.get("total_cases", 0)
+            parts.append("[STATS] Overall statistics:\n")
+            parts.append(f"  Total potential plagiarism cases: {total_cases}\n\n")
+
+            by_question = statistics.get("by_question") or {}
+            if by_question:
+                parts.append("[STATS] Cases by question:\n")
+                parts.extend(
+                    f"  Question {question_num}: {by_question[question_num]} case(s)\n"
+                    for question_num in sorted(by_question.keys())
                 )
-                f.write(
-                    f"Similarity threshold: "
-                    f"{config.Config.SIMILARITY_THRESHOLD}%\n"
+                parts.append("\n")
+
+            clusters = statistics.get("clusters") or []
+            if clusters:
+                parts.append("🔗 Plagiarism clusters:\n")
+                if cluster_students is None:
+                    cluster_students = _join_cluster_students(clusters)
+                parts.extend(
+                    f"  Cluster #{cluster['cluster_id']}: "
+                    f"{cluster['size']} students – [{students_str}]\n"
+                    for cluster, students_str in zip(clusters, cluster_students)
                 )
-                f.write(
-                    f"Minimum token count: {config.Config.MIN_TOKEN_COUNT}\n"
-                )
-                f.write("\n" + "=" * 80 + "\n\n")
+                parts.append("\n")
 
-                total_cases = statistics.get("total_cases", 0)
-                f.write("[STATS] Overall statistics:\n")
-                f.write(
-                    f"  Total potential plagiarism cases: {total_cases}\n\n"
-                )
+            if plagiarism_cases:
+                parts.append("🔍 All detected cases:\n")
+                parts.append("-" * 80 + "\n")
 
-                by_question = statistics.get("by_question") or {}
-                if by_question:
-                    f.write("[STATS] Cases by question:\n")
-                    for question_num in sorted(by_question.keys()):
-                        count = by_question[question_num]
-                        f.write(f"  Question {question_num}: {count} case(s)\n")
-                    f.write("\n")
-
-                clusters = statistics.get("clusters") or []
-                if clusters:
-                    f.write("🔗 Plagiarism clusters:\n")
-                    for cluster in clusters:
-                        students_str = ", ".join(cluster["students"])
-                        f.write(
-                            f"  Cluster #{cluster['cluster_id']}: "
-                            f"{cluster['size']} students – [{students_str}]\n"
-                        )
-                    f.write("\n")
+                if sorted_cases is None:
+                    sorted_cases = _sort_cases(plagiarism_cases)
 
-                if plagiarism_cases:
-                    f.write("🔍 All detected cases:\n")
-                    f.write("-" * 80 + "\n")
+                for question_num, question_cases in groupby(
+                    sorted_cases, key=itemgetter("question")
+                ):
+                    parts.append(f"\n📝 Question {question_num}:\n")
+                    parts.append("-" * 80 + "\n")
+                    parts.append("".join(
+                        _CASE_LINE_FORMAT % _case_line_fields(case)
+                        for case in question_cases
+                    ))
 
-                    current_question: Optional[int] = None
-                    for case in sorted(
-                        plagiarism_cases,
-                        key=lambda x: (x["question"], -x["similarity"]),
-                    ):
-                        if current_question != case["question"]:
-                            current_question = case["question"]
-                            f.write(f"\n📝 Question {current_question}:\n")
-                            f.write("-" * 80 + "\n")
-
-                        f.write(
-                            f"  • {case['student1']} <-> {case['student2']}: "
-                            f"{case['similarity']:.2f}%\n"
-                        )
+            with open(
+                report_path, "w", encoding="utf-8", buffering=REPORT_BUFFER_SIZE
+            ) as f:
+                f.write("".join(parts))
 
             print(f"[OK] Detailed text report saved: {report_path}")
             return True
@@ -177,53 +447,57 @@ class Reporter:
         """
         Generate an HTML side-by-side diff for a single plagiarism case.
         """
-        try:
-            file1_path = case.get("file1")
-            file2_path = case.get("file2")
-
-            if not file1_path or not file2_path:
-                return None
-
-            with open(file1_path, "r", encoding="utf-8", errors="ignore") as f:
-                lines1 = f.readlines()
-
-            with open(file2_path, "r", encoding="utf-8", errors="ignore") as f:
-                lines2 = f.readlines()
-
-            html_diff = HtmlDiff(tabsize=4, wrapcolumn=80)
-            html_content = html_diff.make_file(
-                lines1,
-                lines2,
-                fromdesc=f"Student: {case['student1']}",
-                todesc=f"Student: {case['student2']}",
-                context=True,
-                numlines=3,
-            )
-
-            html_filename = (
-                f"Q{case['question']}_{case['student1']}_vs_{case['student2']}.html"
-            )
-            html_path = os.path.join(self.html_reports_dir, html_filename)
-
-            with open(html_path, "w", encoding="utf-8") as f:
-                f.write(html_content)
-
-            return html_path
-
-        except Exception as exc:  # pragma: no cover - defensive logging
-            print(f"  ⚠ Error generating HTML diff: {exc}")
-            return None
+        self._ensure_html_reports_dir()
+        return _generate_html_diff(
+            case,
+            self.html_reports_dir,
+            self._source_lines,
+            config.Config.COMPRESS_HTML_REPORTS,
+        )
+
+    def _ensure_html_reports_dir(self) -> None:
+        """
+        Create the HTML reports directory once.
+        """
+        if not self._html_dir_ready:
+            os.makedirs(self.html_reports_dir, exist_ok=True)
+            self._html_dir_ready = True
 
     def generate_html_reports(self, plagiarism_cases: List[Dict]) -> int:
         """
         Generate HTML diff reports for all detected cases.
+
+        The diffs are CPU-bound (pure-Python difflib), so many cases are
+        written in a process pool; few cases, or any failure to start the
+        pool, fall back to writing them in-process.
         """
         generated_count = 0
 
         print("\n[STEP] Generating HTML diff reports...")
 
-        for case in plagiarism_cases:
-            html_path = self.generate_html_diff(case)
+        html_paths: Optional[List[Optional[str]]] = None
+        workers = config.Config.COMPARISON_WORKERS or os.cpu_count() or 1
+        if workers > 1 and len(plagiarism_cases) >= PARALLEL_MIN_HTML_REPORTS:
+            self._ensure_html_reports_dir()
+            first_table = HtmlDiff._default_prefix
+            try:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    html_paths = list(executor.map(
+                        _generate_html_diff_in_worker,
+                        plagiarism_cases,
+                        repeat(self.html_reports_dir),
+                        range(first_table, first_table + len(plagiarism_cases)),
+                        # Spawned workers re-import config, so pass the setting
+                        repeat(config.Config.COMPRESS_HTML_REPORTS),
+                        chunksize=max(1, len(plagiarism_cases) // (workers * 4)),
+                    ))
+                HtmlDiff._default_prefix = first_table + len(plagiarism_cases)
+            except Exception as exc:
+                print(f"  [WARN] Parallel HTML reports unavailable, writing serially: {exc}")
+        if html_paths is None:
+            html_paths = [self.generate_html_diff(case) for case in plagiarism_cases]
+
+        for case, html_path in zip(plagiarism_cases, html_paths):
             if html_path:
                 case["html_report"] = html_path
                 generated_count += 1
@@ -235,49 +509,46 @@ class Reporter:
         self,
         plagiarism_cases: List[Dict],
         statistics: Optional[Dict] = None,
+        sorted_cases: Optional[List[Dict]] = None,
+        cluster_students: Optional[List[str]] = None,
     ) -> bool:
         """
         Generate the main CSV report and an optional clusters CSV.
+
+        sorted_cases, if given, are the cases already in report order, and
+        cluster_students the clusters' students already joined.
         """
         try:
-            sorted_cases = sorted(
-                plagiarism_cases,
-                key=lambda x: (x["question"], -x["similarity"]),
-            )
+            if sorted_cases is None:
+                sorted_cases = _sort_cases(plagiarism_cases)
 
             with open(
                 self.report_file,
                 "w",
                 newline="",
                 encoding=config.Config.REPORT_ENCODING,
+                buffering=REPORT_BUFFER_SIZE,
             ) as csvfile:
-                fieldnames = [
-                    "Question",
-                    "Student 1",
-                    "Student 2",
-                    "Similarity %",
-                    "HTML Report",
+                # Rows are tuples in column order (no per-row dicts), written
+                # in one go
+                rows = [
+                    ("Question", "Student 1", "Student 2", "Similarity %", "HTML Report")
                 ]
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-
-                writer.writeheader()
-
-                for case in sorted_cases:
-                    html_report = case.get("html_report", "")
-                    if html_report:
-                        html_report = os.path.relpath(
-                            html_report, config.Config.OUTPUT_DIR
-                        )
 
-                    writer.writerow(
-                        {
-                            "Question": f"Q{case['question']}",
-                            "Student 1": case["student1"],
-                            "Student 2": case["student2"],
-                            "Similarity %": f"{case['similarity']:.2f}",
-                            "HTML Report": html_report,
-                        }
+                relative_dirs: Dict[str, str] = {}
+                rows.extend(
+                    (
+                        f"Q{case['question']}",
+                        case["student1"],
+                        case["student2"],
+                        f"{case['similarity']:.2f}",
+                        _relative_report_path(
+                            case.get("html_report", ""), relative_dirs
+                        ),
                     )
+                    for case in sorted_cases
+                )
+                csvfile.write(_csv_text(rows))
 
             print(f"\n[OK] CSV plagiarism report saved: {self.report_file}")
 
@@ -291,19 +562,21 @@ class Reporter:
                     "w",
                     newline="",
                     encoding=config.Config.REPORT_ENCODING,
+                    buffering=REPORT_BUFFER_SIZE,
                 ) as csvfile:
-                    fieldnames = ["Cluster ID", "Size", "Students"]
-                    writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                    writer.writeheader()
-
-                    for cluster in statistics["clusters"]:
-                        writer.writerow(
-                            {
-                                "Cluster ID": f"Cluster #{cluster['cluster_id']}",
-                                "Size": cluster["size"],
-                                "Students": ", ".join(cluster["students"]),
-                            }
+                    clusters = statistics["clusters"]
+                    if cluster_students is None:
+                        cluster_students = _join_cluster_students(clusters)
+                    rows = [("Cluster ID", "Size", "Students")]
+                    rows.extend(
+                        (
+                            f"Cluster #{cluster['cluster_id']}",
+                            str(cluster["size"]),
+                            students_str,
                         )
+                        for cluster, students_str in zip(clusters, cluster_students)
+                    )
+                    csvfile.write(_csv_text(rows))
 
                 print(f"[OK] Cluster report saved: {clusters_file}")
 
@@ -313,22 +586,119 @@ class Reporter:
             print(f"\n[ERROR] Error generating CSV report: {exc}")
             return False
 
-    def generate_all_reports(
+    def _compute_stats(self, plagiarism_cases: List[Dict]) -> Dict:
+        """
+        Count cases per question, per student and per similarity bucket
+        (counting runs in C).
+
+        The buckets are the detector's (see get_statistics). Clusters come
+        only from the detector's statistics and are left empty here.
+        """
+        from plagiarism_detector import (
+            SIMILARITY_BUCKET_EDGES,
+            SIMILARITY_BUCKET_LABELS,
+        )
+
+        # Bucket index 0 means below the lowest edge (not counted)
+        bucket_counts = Counter(map(
+            partial(bisect_right, SIMILARITY_BUCKET_EDGES),
+            map(itemgetter("similarity"), plagiarism_cases),
+        ))
+        return {
+            "total_cases": len(plagiarism_cases),
+            "by_question": Counter(map(itemgetter("question"), plagiarism_cases)),
+            "by_student": Counter(chain.from_iterable(
+                map(itemgetter("student1", "student2"), plagiarism_cases)
+            )),
+            "similarity_distribution": {
+                label: bucket_counts[index]
+                for index, label in enumerate(SIMILARITY_BUCKET_LABELS, start=1)
+            },
+            "clusters": [],
+        }
+
+    def generate_json_report(
         self,
         plagiarism_cases: List[Dict],
         statistics: Dict,
+        sorted_cases: Optional[List[Dict]] = None,
+    ) -> bool:
+        """
+        Write the statistics and all cases as JSON, for other programs.
+
+        sorted_cases, if given, are the cases already in report order.
+        """
+        try:
+            if sorted_cases is None:
+                sorted_cases = _sort_cases(plagiarism_cases)
+
+            report_path = os.path.join(
+                config.Config.OUTPUT_DIR,
+                "Plagiarism_Report.json",
+            )
+            payload = {"statistics": statistics, "cases": sorted_cases}
+
+            if ORJSON_AVAILABLE:
+                data = orjson.dumps(
+                    payload, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+                )
+            else:
+                data = json.dumps(payload, ensure_ascii=False, indent=2).encode("utf-8")
+
+            with open(report_path, "wb") as f:
+                f.write(data)
+
+            print(f"[OK] JSON report saved: {report_path}")
+            return True
+
+        except Exception as exc:  # pragma: no cover - defensive logging
+            print(f"[ERROR] Error generating JSON report: {exc}")
+            return False
+
+    def generate_all_reports(
+        self,
+        plagiarism_cases: List[Dict],
+        statistics: Optional[Dict] = None,
     ) -> None:
         """
         Run the full reporting pipeline: console summary, HTML, CSV, and text.
+
+        Without statistics, the basic counts are computed from the cases.
         """
         print("\n" + "=" * 60)
         print("[STEP] Generating reports")
         print("=" * 60)
 
-        self.print_console_summary(plagiarism_cases, statistics)
-        self.generate_html_reports(plagiarism_cases)
-        self.generate_csv_report(plagiarism_cases, statistics)
-        self.generate_detailed_report(plagiarism_cases, statistics)
+        if not statistics:
+            statistics = self._compute_stats(plagiarism_cases)
+
+        # Joined once for the console, text and CSV reports
+        cluster_students = _join_cluster_students(statistics.get("clusters") or [])
+        self.print_console_summary(plagiarism_cases, statistics, cluster_students)
+        # All reports list the cases in the same order; sort them once
+        sorted_cases = _sort_cases(plagiarism_cases)
+
+        # The text report does not link the HTML diffs, so it is written
+        # while they are generated; the CSV and JSON reports need their paths
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            detailed_report = executor.submit(
+                self.generate_detailed_report,
+                plagiarism_cases,
+                statistics,
+                sorted_cases,
+                cluster_students,
+            )
+            self.generate_html_reports(plagiarism_cases)
+            self.generate_csv_report(
+                plagiarism_cases, statistics, sorted_cases, cluster_students
+            )
+            if config.Config.JSON_REPORT_ENABLED:
+                self.generate_json_report(plagiarism_cases, statistics, sorted_cases)
+            detailed_report.result()
+
+
+# Fixed first lines of the log file
+_LOG_HEADER = "=" * 80 + "\nMasterGrader log file\n" + "=" * 80 + "\n"
 
 
 def write_log_file(log_entries: List[Dict]) -> None:
@@ -338,30 +708,33 @@ def write_log_file(log_entries: List[Dict]) -> None:
     log_file = config.Config.get_log_file_path()
 
     try:
-        with open(log_file, "w", encoding="utf-8") as f:
-            f.write("=" * 80 + "\n")
-            f.write("MasterGrader log file\n")
-            f.write("=" * 80 + "\n")
-            f.write(
-                f"Created at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
-            )
-
-            if not log_entries:
-                f.write("No errors were recorded.\n")
-            else:
-                f.write(f"Number of errors: {len(log_entries)}\n\n")
-
-                for entry in log_entries:
-                    message = entry.get("message", "Unknown error")
-                    student_id = entry.get("student_id")
-                    file_path = entry.get("file_path")
-
-                    f.write(f"Error: {message}\n")
-                    if student_id:
-                        f.write(f"  Student: {student_id}\n")
-                    if file_path:
-                        f.write(f"  File: {file_path}\n")
-                    f.write("\n")
+        # Build the whole log in memory and write it at once
+        parts: List[str] = [
+            _LOG_HEADER,
+            f"Created at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n",
+        ]
+
+        if not log_entries:
+            parts.append("No errors were recorded.\n")
+        else:
+            parts.append(f"Number of errors: {len(log_entries)}\n\n")
+
+            for entry in log_entries:
+                message = entry.get("message", "Unknown error")
+                student_id = entry.get("student_id")
+                file_path = entry.get("file_path")
+
+                parts.append(f"Error: {message}\n")
+                if student_id:
+                    parts.append(f"  Student: {student_id}\n")
+                if file_path:
+                    parts.append(f"  File: {file_path}\n")
+                parts.append("\n")
+
+        with open(
+            log_file, "w", encoding="utf-8", buffering=REPORT_BUFFER_SIZE
+        ) as f:
+            f.write("".join(parts))
 
         print(f"[ Log file saved: {log_file}")
 
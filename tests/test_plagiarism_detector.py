@@ -0,0 +1,75 @@
+"""Tests for PlagiarismDetector similarity scores."""
+
+from difflib import SequenceMatcher
+
+import pytest
+
+import config
+import tokenizer
+from plagiarism_detector import PlagiarismDetector
+
+# Two programs whose ratio() differs with the argument order
+CODE_A = (
+    "int main() { int a = 1; while (x) x--; for (i = 0; i < n; i++) s += i; "
+    "while (x) x--; int a = 1; int b; }"
+)
+CODE_B = "int main() { b = a * 2; b = a * 2; int b; }"
+
+
+@pytest.fixture(autouse=True)
+def small_programs(monkeypatch):
+    """Score every pair of the short test programs, in process."""
+    monkeypatch.setattr(config.Config, "MIN_TOKEN_COUNT", 1)
+    monkeypatch.setattr(config.Config, "SIMILARITY_THRESHOLD", 0.0)
+    monkeypatch.setattr(config.Config, "SIMILARITY_BACKEND", "difflib")
+    monkeypatch.setattr(config.Config, "MINHASH_PREFILTER", False)
+    monkeypatch.setattr(config.Config, "COMPARISON_WORKERS", 1)
+
+
+@pytest.fixture
+def question_dir(tmp_path):
+    """A question with file a and two copies (b, c) of the same other program."""
+    (tmp_path / "a.c").write_text(CODE_A)
+    (tmp_path / "b.c").write_text(CODE_B)
+    (tmp_path / "c.c").write_text(CODE_B)
+    return tmp_path
+
+
+def _expected(code1, code2):
+    """ratio() of the two programs' token strings, with code1 first."""
+    c_tokenizer = tokenizer.CTokenizer()
+    return SequenceMatcher(
+        None, c_tokenizer.tokenize(code1), c_tokenizer.tokenize(code2)
+    ).ratio() * 100.0
+
+
+def test_test_programs_are_asymmetric():
+    assert round(_expected(CODE_A, CODE_B), 2) != round(_expected(CODE_B, CODE_A), 2)
+
+
+def test_reversed_pair_is_not_served_from_cache(question_dir):
+    detector = PlagiarismDetector()
+    
+    # c has b's tokens, so (a, c) is the reverse of the cached (b, a)
+    assert detector.compare_two_files(
+        str(question_dir / "b.c"), str(question_dir / "a.c")
+    ) == _expected(CODE_B, CODE_A)
+    assert detector.compare_two_files(
+        str(question_dir / "a.c"), str(question_dir / "c.c")
+    ) == _expected(CODE_A, CODE_B)
+
+
+@pytest.mark.parametrize("warm_order", [("a.c", "b.c"), ("b.c", "a.c")])
+def test_question_scores_match_compare_two_files(question_dir, warm_order):
+    detector = PlagiarismDetector()
+    # Cache one orientation first: the question must not reuse it reversed
+    detector.compare_two_files(*(str(question_dir / name) for name in warm_order))
+    
+    codes = {"a": CODE_A, "b": CODE_B, "c": CODE_B}
+    cases = detector.detect_plagiarism_in_question(str(question_dir), 1)
+    
+    assert len(cases) == 3
+    for case in cases:
+        expected = _expected(codes[case["student1"]], codes[case["student2"]])
+        assert case["similarity"] == round(expected, 2)
+        assert round(detector.compare_two_files(case["file1"], case["file2"]), 2) == case["similarity"]
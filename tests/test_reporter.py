@@ -0,0 +1,26 @@
+"""Tests for the Reporter."""
+
+import json
+
+import config
+from reporter import Reporter
+
+
+def test_reports_without_statistics_count_similarity_buckets(tmp_path, monkeypatch):
+    monkeypatch.setattr(config.Config, "OUTPUT_DIR", str(tmp_path))
+    monkeypatch.setattr(config.Config, "JSON_REPORT_ENABLED", True)
+    cases = [
+        {"question": 1, "student1": "s1", "student2": "s2", "similarity": similarity}
+        for similarity in (80.0, 85.0, 89.9, 92.5, 95.0, 99.0, 100.0)
+    ]
+
+    Reporter().generate_all_reports(cases)
+
+    with open(tmp_path / "Plagiarism_Report.json", encoding="utf-8") as f:
+        statistics = json.load(f)["statistics"]
+    assert statistics["similarity_distribution"] == {
+        "85-90": 2,
+        "90-95": 1,
+        "95-99": 1,
+        "99-100": 2,
+    }
@@ -0,0 +1,40 @@
+"""Tests for the tokenizer's file helpers."""
+
+import functools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+import config
+import tokenizer
+
+CODE = "int main() { /* keep me */ int a = 1; // and me\n return a; }\n"
+
+
+@pytest.fixture
+def c_files(tmp_path):
+    """A few C files with comments."""
+    paths = []
+    for k in range(4):
+        path = tmp_path / f"{k}.c"
+        path.write_text(f"// file {k}\n{CODE}")
+        paths.append(str(path))
+    return paths
+
+
+def test_batch_workers_use_runtime_config_under_spawn(c_files, monkeypatch):
+    # Spawned workers re-import config: the setting must still reach them
+    monkeypatch.setattr(config.Config, "REMOVE_COMMENTS", False)
+    monkeypatch.setattr(tokenizer, "PARALLEL_MIN_FILES", 0)
+    monkeypatch.setattr(
+        tokenizer,
+        "ProcessPoolExecutor",
+        functools.partial(ProcessPoolExecutor, mp_context=multiprocessing.get_context("spawn")),
+    )
+    
+    serial = tokenizer.tokenize_files_batch(c_files, "literal", workers=1)
+    parallel = tokenizer.tokenize_files_batch(c_files, "literal", workers=2)
+    
+    assert parallel == serial
+    assert "keep" in serial[c_files[0]]